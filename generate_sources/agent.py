@@ -1,28 +1,83 @@
 """Pydantic-AI agent for security analysis of user input handlers."""
 
-from typing import List, Optional
-
+import asyncio
+import hashlib
+import json
+import re
+from contextlib import aclosing
+from operator import attrgetter
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
 from pydantic_ai import Agent
+from pydantic_ai.models import Model
 
 from models import (
+    CodeLocation,
+    DeploymentContext,
+    FastFilterBatch,
+    FastFilterVerdict,
     FunctionAnalysis,
     PrioritizedFindings,
     AstGrepFinding,
     RiskLevel,
+    RISK_RANK,
+    TriageSummary,
 )
+from prefilter import is_plausible_handler
+from triage_cache import PROMPT_VERSION, TriageCache
 
 try:
     from deployment_parser import DeploymentModelParser
 except ImportError:
     DeploymentModelParser = None
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+
+# Connection pool shared by every agent's HTTP client
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+# Long reads match the provider SDK default so slow completions aren't cut off
+HTTP_TIMEOUT = httpx.Timeout(600, connect=5)
+
+# Attempts the provider SDKs make (with exponential backoff) on rate limits,
+# timeouts and 5xx errors, before a call counts as failed
+MAX_RETRIES = 3
+
+# How often batch mode checks whether the OpenAI batch job has finished
+BATCH_POLL_INTERVAL_SECONDS = 30
+
+# Fraction of findings that must complete before the summary call is started
+# early, overlapping the remaining triage
+SUMMARY_OVERLAP_FRACTION = 0.8
+
+# Character budgets for code sent to the triage model and the fast filter
+CONTEXT_MAX_CHARS = 2000
+FAST_FILTER_CONTEXT_CHARS = 500
+
+# Import/include lines, dropped first when clipping code context
+IMPORT_LINE_RE = re.compile(r"\s*(import\b|from\s+[\w.]+\s+import\b|#include\b|use\s+[\w:]+)")
 
 # Fast false positive detection prompt
 FAST_FALSE_POSITIVE_CHECK = """You are a fast filter that quickly identifies obvious false positives.
 
-Given this code snippet, answer ONE question: Is this a real user input handler (API endpoint, GraphQL resolver, gRPC handler) that processes runtime requests?
+Given a file path, framework and code snippet, answer ONE question: Is this a real user input handler (API endpoint, GraphQL resolver, gRPC handler) that processes runtime requests?
+
+Your verdict is one of:
+- "REAL" if it's an actual handler that processes user requests at runtime
+- "FALSE_POSITIVE" if it's any of: config files, test code, type declarations, utility functions, client-side code, build scripts
+
+Be VERY strict - when in doubt, say REAL (we'll do detailed analysis later)."""
+
+# Fast false positive detection prompt for several numbered snippets at once
+FAST_FALSE_POSITIVE_BATCH_CHECK = """You are a fast filter that quickly identifies obvious false positives.
+
+You will receive several numbered code snippets. For EACH one, answer ONE question: Is this a real user input handler (API endpoint, GraphQL resolver, gRPC handler) that processes runtime requests?
 
-Answer with ONLY:
+Return one verdict per snippet, using the snippet's number as its index:
 - "REAL" if it's an actual handler that processes user requests at runtime
 - "FALSE_POSITIVE" if it's any of: config files, test code, type declarations, utility functions, client-side code, build scripts
 
@@ -71,17 +126,185 @@ Your job is NOT to find vulnerabilities - that comes later. Your job is to:
    - What operations should they scrutinize?
    - Why is this function prioritized at this level?
 
+Each request gives you the location, framework, language, matching ast-grep rule and code context of one potential handler, and sometimes deployment context from infrastructure documentation. Deployment context should inform your risk assessment: internet-facing services in public trust zones handling unauthenticated input are higher risk.
+
+For every request, answer these questions:
+1. Is this actually a user input handler (API endpoint, GraphQL resolver, etc.) or is it configuration/test code?
+2. What user input does it accept? (HTTP body, headers, URL params, GraphQL args, etc.)
+3. Does it require authentication? Look for auth middleware, decorators, or checks
+4. What does it DO with user input? (DB queries, file operations, external calls, business logic, etc.)
+5. What priority level for security review? (CRITICAL/HIGH/MEDIUM/LOW/INFO)
+6. What should the next security reviewer focus on when analyzing this function?
+
+Extract the function/handler name, endpoint path, HTTP methods if visible.
+
+Provide clear, actionable reasoning for your triage decision.
+
+Decide `is_real_handler` FIRST. If it is not a real handler, set `is_real_handler=false` and `risk_level=info`, give a one-sentence reasoning, and leave the other fields minimal (empty lists, nulls) - do NOT elaborate.
+
 Be precise and concise. The next agent will do the deep vulnerability analysis - you're just triaging and prioritizing."""
 
+# System prompt for the summary agent
+SUMMARY_SYSTEM_PROMPT = """You are a security lead creating a prioritized triage report for the security review team.
+
+Your output should:
+1. Summarize how many real user input handlers were found vs false positives
+2. Highlight the highest priority items that need immediate deep security review
+3. Provide guidance on what the security reviewers should focus on for each priority level
+4. Recommend an order of review (which functions to analyze first)
+
+Each request gives you the triage statistics and the top priority functions. Create:
+1. A summary (2-3 paragraphs) explaining the triage results and what was found
+2. Specific guidance on what to review first and what to focus on
+3. 3-5 recommendations for the security review process
+
+This is a TRIAGE report - the actual vulnerability hunting happens in the next phase."""
+
+# User-message templates. Only the per-call fields are substituted with
+# format_map; everything invariant lives in the system prompts above.
+FAST_FILTER_PROMPT_TEMPLATE = """File: {file_path}
+Framework: {framework}
+
+Code:
+```{language}
+{code_context}
+```"""
+
+FAST_FILTER_BATCH_ITEM_TEMPLATE = """### {number}
+File: {file_path}
+Framework: {framework}
+
+```{language}
+{code_context}
+```"""
+
+TRIAGE_PROMPT_TEMPLATE = """**Location**: {file_path}:{line_number}
+**Framework**: {framework}
+**Language**: {language}
+**Rule that matched**: {rule_id}
+
+**Code Context**:
+```{language}
+{code_context}
+```"""
+
+DEPLOYMENT_CONTEXT_TEMPLATE = """
+
+**Deployment Context** (from infrastructure documentation):
+- Service: {service_name}
+- Trust Zone: {trust_zone}
+- Network Exposure: {network_exposure}
+- Deployment Target: {deployment_target}
+- Authentication Method: {authentication_method}
+- Upstream Services (who calls this): {upstream_services}
+- Downstream Services (what this calls): {downstream_services}"""
+
+SUMMARY_PROMPT_TEMPLATE = """**Total Items Scanned**: {total}
+**Real User Input Handlers**: {real_handlers}
+**False Positives (config/tests)**: {info}
+**High Priority for Review**: {high_priority} (CRITICAL + HIGH)
+
+**Triage Breakdown**:
+- CRITICAL: {critical} (unauthenticated + sensitive operations)
+- HIGH: {high} (authenticated sensitive ops OR unauth complex)
+- MEDIUM: {medium} (authenticated standard CRUD)
+- LOW: {low} (simple authenticated reads)
+- INFO: {info} (not real user input handlers)
+
+**Top Priority Functions for Deep Review**:
+{top_concerns}"""
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled client that provider SDK calls are sent through.
+
+    Returns:
+        An HTTP/2 client, or HTTP/1.1 when the optional h2 package is missing
+    """
+    try:
+        return httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    except ImportError:
+        # HTTP/2 needs the optional h2 package
+        return httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+class _ProgressPrinter:
+    """Progress callback for the CLI: a tqdm bar if available, else one line per finding."""
+
+    def __init__(self):
+        self._bar = None
+
+    def __call__(self, index: int, total: int, finding: AstGrepFinding, status: str) -> None:
+        location = f"{finding.file_path}:{finding.line_number}"
+        if tqdm is None:
+            print(f"[{index}/{total}] {location} {status}")
+            return
+
+        if self._bar is None:
+            self._bar = tqdm(total=total, unit="finding")
+        self._bar.set_postfix_str(f"{location} {status}", refresh=False)
+        self._bar.update(1)
+
+    def close(self) -> None:
+        if self._bar is not None:
+            self._bar.close()
+
 
 class SecurityTriageAgent:
     """AI agent for triaging and prioritizing user input handlers for security review."""
 
+    # (framework, rule_id) pairs whose matches are decorator/annotation-bound
+    # routes that the fast filter essentially never rejects; these skip it
+    # and go straight to full triage
+    HIGH_CONFIDENCE_RULES: frozenset[tuple[str, str]] = frozenset({
+        ("Fastapi", "fastapi-routes"),
+        ("Flask", "flask-routes"),
+        ("Spring Boot", "spring-boot-routes"),
+        ("Jaxrs", "jaxrs-routes"),
+        ("Nestjs", "nestjs-routes"),
+        ("Grpc Python", "grpc-python-routes"),
+        ("Grpc Java", "grpc-java-routes"),
+        ("Grpc Go", "grpc-go-routes"),
+    })
+
+    # Test and config files; findings here are reported as INFO without any LLM call
+    # (see _static_false_positive_reason)
+    PATH_DENYLIST_RE = re.compile(
+        r"(^|/)(tests?|__tests__|spec)/"
+        r"|(^|/)(test_[^/]*\.py|[^/]*_test\.(py|go)|conftest\.py"
+        r"|[^/]*\.(test|spec)\.[jt]sx?|[^/]*\.config\.[jt]sx?)$"
+    )
+
+    # Frameworks whose rules match calls like app.get(path, handler); the same
+    # shape also matches HTTP client and cache calls
+    CALL_STYLE_FRAMEWORKS = frozenset({"Express", "Fastify", "Hono", "Koa", "Gin", "Echo"})
+
+    # Matched call is on a well-known HTTP client or cache object
+    CLIENT_CALL_RE = re.compile(
+        r"^\s*(?:await\s+|return\s+)?"
+        r"(?:axios|\$|jQuery|superagent|got|ky|redis|cache|client|httpClient|this\.http|\$http)"
+        r"\.(?:get|post|put|patch|delete)\s*\(",
+        re.IGNORECASE,
+    )
+
+    # Matched call's first argument is a string literal that isn't a route path
+    NON_PATH_LITERAL_RE = re.compile(
+        r"^\s*[\w$.]+\.(?:get|post|put|patch|delete)\s*\(\s*['\"`](?![/*])",
+        re.IGNORECASE,
+    )
+
     def __init__(
         self,
         model: str = "openai:gpt-5",
         api_key: str | None = None,
-        deployment_parser: Optional[DeploymentModelParser] = None
+        deployment_parser: Optional[DeploymentModelParser] = None,
+        concurrency: int = 10,
+        fast_filter_batch_size: int = 20,
+        cache: Optional[TriageCache] = None,
+        collapse_duplicates: bool = False,
+        cascade: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize the security triage agent.
@@ -90,42 +313,148 @@ class SecurityTriageAgent:
             model: Model identifier (e.g., "openai:gpt-5", "anthropic:claude-3-5-sonnet-20241022")
             api_key: API key for the model provider
             deployment_parser: Optional deployment model parser for enriching findings
+            concurrency: Maximum number of findings triaged concurrently
+            fast_filter_batch_size: Number of findings sent to the fast filter per call
+            cache: Optional on-disk cache of fast filter and triage results;
+                the agent closes it in aclose()
+            collapse_duplicates: Report identical code at several locations once,
+                instead of once per location
+            cascade: Skip the separate fast filter and triage with the fast model
+                first, re-running only real CRITICAL/HIGH handlers on the main model
+            http_client: Optional HTTP client to send all provider requests
+                through; the caller keeps ownership and closes it. By default
+                the agent creates its own and closes it in aclose()
         """
         self.model_name = model
+        self._api_key = api_key
         self.deployment_parser = deployment_parser
+        self.cache = cache
+        self.collapse_duplicates = collapse_duplicates
+        self.cascade = cascade
+
+        # Bounds how many findings have LLM calls in flight at once
+        self._sem = asyncio.Semaphore(concurrency)
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self.fast_filter_batch_size = max(1, fast_filter_batch_size)
+
+        # One pooled (HTTP/2 where available) client shared by every agent, so
+        # concurrent completions reuse connections instead of opening new ones
+        self._owns_http = http_client is None
+        self._http = http_client if http_client is not None else build_http_client()
 
         # Fast filter agent for quick false positive detection (uses cheaper/faster model)
-        fast_model = "openai:gpt-5-mini" if "openai" in model else model
+        fast_model_name = "openai:gpt-5-mini" if "openai" in model else model
+        self.fast_model_name = fast_model_name
+        fast_model = self._build_model(fast_model_name, api_key)
+        main_model = self._build_model(model, api_key)
         self.fast_filter = Agent(
             fast_model,
-            output_type=str,
+            output_type=FastFilterVerdict,
             system_prompt=FAST_FALSE_POSITIVE_CHECK,
         )
+        self.fast_filter_batch = Agent(
+            fast_model,
+            output_type=FastFilterBatch,
+            system_prompt=FAST_FALSE_POSITIVE_BATCH_CHECK,
+        )
 
         # Initialize the triage agent for individual function analysis
         self.triage_agent = Agent(
-            model,
+            main_model,
+            output_type=FunctionAnalysis,
+            system_prompt=USER_INPUT_TRIAGE_SYSTEM_PROMPT,
+        )
+
+        # Same triage on the fast model, used as the first stage in cascade mode
+        self.fast_triage_agent = Agent(
+            fast_model,
             output_type=FunctionAnalysis,
             system_prompt=USER_INPUT_TRIAGE_SYSTEM_PROMPT,
         )
 
-        # Agent for creating the final prioritized summary
+        # Agent for the final narrative summary; it only writes prose over
+        # already-classified data, so the fast model is enough
         self.summary_agent = Agent(
-            model,
-            output_type=PrioritizedFindings,
-            system_prompt="""You are a security lead creating a prioritized triage report for the security review team.
+            fast_model,
+            output_type=TriageSummary,
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+        )
 
-Your output should:
-1. Summarize how many real user input handlers were found vs false positives
-2. Highlight the highest priority items that need immediate deep security review
-3. Provide guidance on what the security reviewers should focus on for each priority level
-4. Recommend an order of review (which functions to analyze first)
+    def _build_model(self, model: str, api_key: str | None) -> Model | str:
+        """
+        Build a pydantic-ai model that uses the shared HTTP client.
 
-This is a TRIAGE report - the actual vulnerability hunting happens in the next phase.""",
+        Args:
+            model: Model identifier, "provider:name"
+            api_key: API key for the model provider
+
+        Returns:
+            Model instance for OpenAI/Anthropic, otherwise the identifier
+            unchanged for pydantic-ai to resolve
+        """
+        provider, _, name = model.partition(":")
+        if provider == "openai":
+            from openai import AsyncOpenAI
+            try:
+                from pydantic_ai.models.openai import OpenAIChatModel
+            except ImportError:
+                # Releases before the Chat/Responses split
+                from pydantic_ai.models.openai import OpenAIModel as OpenAIChatModel
+            from pydantic_ai.providers.openai import OpenAIProvider
+
+            client = AsyncOpenAI(
+                api_key=api_key, http_client=self._http, max_retries=MAX_RETRIES
+            )
+            return OpenAIChatModel(name, provider=OpenAIProvider(openai_client=client))
+        if provider == "anthropic":
+            from anthropic import AsyncAnthropic
+            from pydantic_ai.models.anthropic import AnthropicModel
+            from pydantic_ai.providers.anthropic import AnthropicProvider
+
+            client = AsyncAnthropic(
+                api_key=api_key, http_client=self._http, max_retries=MAX_RETRIES
+            )
+            return AnthropicModel(name, provider=AnthropicProvider(anthropic_client=client))
+        return model
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> "SecurityTriageAgent":
+        """
+        Construct the agent and start warming up its provider connections.
+
+        Takes the same arguments as the constructor. The warm-up runs in the
+        background, overlapping whatever the caller does before the first
+        real triage call (e.g. reading code context).
+        """
+        agent = cls(*args, **kwargs)
+        agent._warm_up_task = asyncio.create_task(agent.warm_up())
+        return agent
+
+    async def warm_up(self) -> None:
+        """
+        Send a 1-token sentinel request to the fast and main models.
+
+        Opens the pooled connections and initializes the provider clients so
+        the first real finding doesn't pay for it. Failures are ignored.
+        """
+        settings = {"max_tokens": 1}
+        await asyncio.gather(
+            self.fast_filter.run("ping", model_settings=settings),
+            self.triage_agent.run("ping", model_settings=settings),
+            return_exceptions=True,
         )
 
+    async def aclose(self) -> None:
+        """Stop any pending warm-up, then close the cache and any HTTP client the agent created."""
+        if self._warm_up_task is not None:
+            await self._cancel_pending([self._warm_up_task])
+        if self.cache:
+            self.cache.close()
+        if self._owns_http:
+            await self._http.aclose()
+
     async def triage_function(
-        self, finding: AstGrepFinding, code_context: str
+        self, finding: AstGrepFinding, code_context: str, fast: bool = False
     ) -> FunctionAnalysis:
         """
         Triage a single function to determine if it handles user input and its priority.
@@ -133,130 +462,207 @@ This is a TRIAGE report - the actual vulnerability hunting happens in the next p
         Args:
             finding: The ast-grep finding
             code_context: Full code context around the finding
+            fast: Use the fast model instead of the main model
 
         Returns:
             Triage analysis with priority and context for next reviewer
         """
-        # Build the base triage prompt
-        triage_prompt = f"""Triage this potential user input handler found by ast-grep:
-
-**Location**: {finding.file_path}:{finding.line_number}
-**Framework**: {finding.framework}
-**Language**: {finding.language}
-**Rule that matched**: {finding.rule_id}
-
-**Code Context**:
-```{finding.language}
-{code_context}
-```"""
+        agent = self.fast_triage_agent if fast else self.triage_agent
+        model_name = self.fast_model_name if fast else self.model_name
+        code_context = self._clip_context(code_context, anchor=finding.code_snippet)
 
-        # Add deployment context if available
+        deployment_ctx = None
         if self.deployment_parser:
             deployment_ctx = self.deployment_parser.get_deployment_context(finding.file_path)
-            if deployment_ctx:
-                triage_prompt += f"""
-
-**Deployment Context** (from infrastructure documentation):
-- Service: {deployment_ctx.service_name}
-- Trust Zone: {deployment_ctx.trust_zone or 'Unknown'}
-- Network Exposure: {deployment_ctx.network_exposure}
-- Deployment Target: {deployment_ctx.deployment_target}
-- Authentication Method: {deployment_ctx.authentication_method or 'Unknown'}
-- Upstream Services (who calls this): {', '.join(deployment_ctx.upstream_services) if deployment_ctx.upstream_services else 'None'}
-- Downstream Services (what this calls): {', '.join(deployment_ctx.downstream_services) if deployment_ctx.downstream_services else 'None'}
 
-This deployment context should inform your risk assessment. Internet-facing services in public trust zones handling unauthenticated input are higher risk."""
-
-        triage_prompt += """
+        cache_key = None
+        if self.cache:
+            cache_key = self._triage_cache_key(finding, code_context, deployment_ctx, model_name)
+            cached = self.cache.get(cache_key)
+            if cached:
+                # Identical code may have been cached from another call site
+                analysis = self._relocate(
+                    FunctionAnalysis.model_validate_json(cached), finding
+                )
+                analysis.deployment_context = deployment_ctx
+                return analysis
 
-**Your task**: Determine if this is a real user input handler that needs security review, and assign the appropriate triage priority.
+        result = await agent.run(self._triage_prompt(finding, code_context, deployment_ctx))
+        return self._finalize_analysis(result.output, deployment_ctx, cache_key)
 
-Answer these questions:
-1. Is this actually a user input handler (API endpoint, GraphQL resolver, etc.) or is it configuration/test code?
-2. What user input does it accept? (HTTP body, headers, URL params, GraphQL args, etc.)
-3. Does it require authentication? Look for auth middleware, decorators, or checks
-4. What does it DO with user input? (DB queries, file operations, external calls, business logic, etc.)
-5. What priority level for security review? (CRITICAL/HIGH/MEDIUM/LOW/INFO)
-6. What should the next security reviewer focus on when analyzing this function?
+    def _triage_cache_key(
+        self,
+        finding: AstGrepFinding,
+        code_context: str,
+        deployment_ctx: Optional[DeploymentContext],
+        model_name: str,
+    ) -> str:
+        """Cache key for a triage result (everything that goes into the prompt)."""
+        return TriageCache.make_key(
+            "triage",
+            model_name,
+            PROMPT_VERSION,
+            finding.rule_id,
+            finding.framework,
+            code_context,
+            deployment_ctx.model_dump_json() if deployment_ctx else "",
+        )
 
-Extract the function/handler name, endpoint path, HTTP methods if visible.
+    @staticmethod
+    def _triage_prompt(
+        finding: AstGrepFinding,
+        code_context: str,
+        deployment_ctx: Optional[DeploymentContext],
+    ) -> str:
+        """Build the triage user prompt for one finding."""
+        # Only the per-finding data goes in the user prompt; the instructions
+        # live in the system prompt so providers can cache the shared prefix
+        triage_prompt = TRIAGE_PROMPT_TEMPLATE.format_map({
+            "file_path": finding.file_path,
+            "line_number": finding.line_number,
+            "framework": finding.framework,
+            "language": finding.language,
+            "rule_id": finding.rule_id,
+            "code_context": code_context,
+        })
 
-Provide clear, actionable reasoning for your triage decision."""
+        # Add deployment context if available
+        if deployment_ctx:
+            triage_prompt += DEPLOYMENT_CONTEXT_TEMPLATE.format_map({
+                "service_name": deployment_ctx.service_name,
+                "trust_zone": deployment_ctx.trust_zone or "Unknown",
+                "network_exposure": deployment_ctx.network_exposure,
+                "deployment_target": deployment_ctx.deployment_target,
+                "authentication_method": deployment_ctx.authentication_method or "Unknown",
+                "upstream_services": ", ".join(deployment_ctx.upstream_services) or "None",
+                "downstream_services": ", ".join(deployment_ctx.downstream_services) or "None",
+            })
+
+        return triage_prompt
+
+    def _finalize_analysis(
+        self,
+        analysis: FunctionAnalysis,
+        deployment_ctx: Optional[DeploymentContext],
+        cache_key: Optional[str],
+    ) -> FunctionAnalysis:
+        """Normalize a fresh model analysis, cache it and attach deployment context."""
+        if not analysis.is_real_handler:
+            analysis.risk_level = RiskLevel.INFO
 
-        result = await self.triage_agent.run(triage_prompt)
-        analysis = result.output
+        if cache_key:
+            self.cache.put(cache_key, analysis.model_dump_json())
 
         # Enrich with deployment context if we have it
-        if self.deployment_parser:
-            deployment_ctx = self.deployment_parser.get_deployment_context(finding.file_path)
-            if deployment_ctx:
-                analysis.deployment_context = deployment_ctx
+        if deployment_ctx:
+            analysis.deployment_context = deployment_ctx
 
         return analysis
 
     async def prioritize_findings(
-        self, analyses: List[FunctionAnalysis]
+        self,
+        analyses: List[FunctionAnalysis],
+        summary: Optional[TriageSummary] = None,
+        echo: bool = True,
     ) -> PrioritizedFindings:
         """
         Create a prioritized summary of all findings.
 
         Args:
             analyses: List of individual function analyses
+            summary: Already-written summary to reuse instead of calling the
+                summary agent
+            echo: Stream the summary text to stdout as it's generated
 
         Returns:
             Prioritized and summarized findings
         """
-        # Sort by risk level
-        risk_order = {
-            RiskLevel.CRITICAL: 0,
-            RiskLevel.HIGH: 1,
-            RiskLevel.MEDIUM: 2,
-            RiskLevel.LOW: 3,
-            RiskLevel.INFO: 4,
-        }
-        sorted_analyses = sorted(analyses, key=lambda x: risk_order[x.risk_level])
-
-        high_priority_count = sum(
-            1 for a in analyses if a.risk_level in [RiskLevel.CRITICAL, RiskLevel.HIGH]
-        )
-
-        # Count real user input handlers vs false positives
-        real_handlers = [a for a in analyses if a.risk_level != RiskLevel.INFO]
-        false_positives = [a for a in analyses if a.risk_level == RiskLevel.INFO]
-
-        summary_prompt = f"""Create a triage summary for the security review team.
-
-**Total Items Scanned**: {len(analyses)}
-**Real User Input Handlers**: {len(real_handlers)}
-**False Positives (config/tests)**: {len(false_positives)}
-**High Priority for Review**: {high_priority_count} (CRITICAL + HIGH)
+        sorted_analyses, risk_counts = self._rank_analyses(analyses)
+        critical, high = risk_counts[:2]
 
-**Triage Breakdown**:
-- CRITICAL: {sum(1 for a in analyses if a.risk_level == RiskLevel.CRITICAL)} (unauthenticated + sensitive operations)
-- HIGH: {sum(1 for a in analyses if a.risk_level == RiskLevel.HIGH)} (authenticated sensitive ops OR unauth complex)
-- MEDIUM: {sum(1 for a in analyses if a.risk_level == RiskLevel.MEDIUM)} (authenticated standard CRUD)
-- LOW: {sum(1 for a in analyses if a.risk_level == RiskLevel.LOW)} (simple authenticated reads)
-- INFO: {sum(1 for a in analyses if a.risk_level == RiskLevel.INFO)} (not real user input handlers)
+        if summary is None:
+            summary = await self._write_summary(
+                self._summary_prompt(sorted_analyses, risk_counts), echo
+            )
 
-**Top Priority Functions for Deep Review**:
-{self._format_top_concerns(sorted_analyses[:10])}
+        # The findings are our sorted list; the model only writes the prose
+        return PrioritizedFindings(
+            total_functions_analyzed=len(analyses),
+            high_priority_count=critical + high,
+            findings=sorted_analyses,
+            summary=summary.summary,
+            recommendations=summary.recommendations,
+        )
 
-Create:
-1. A summary (2-3 paragraphs) explaining the triage results and what was found
-2. Specific guidance on what to review first and what to focus on
-3. 3-5 recommendations for the security review process
+    @staticmethod
+    def _rank_analyses(
+        analyses: List[FunctionAnalysis],
+    ) -> tuple[List[FunctionAnalysis], List[int]]:
+        """
+        Sort analyses by risk level and count each level.
 
-Remember: This is TRIAGE only - vulnerability identification comes in the next phase."""
+        Returns:
+            Tuple of (analyses highest risk first, count per level in RiskLevel order)
+        """
+        sorted_analyses = sorted(analyses, key=attrgetter("risk_level.rank"))
+        return sorted_analyses, SecurityTriageAgent._count_risk_levels(analyses)
+
+    @staticmethod
+    def _count_risk_levels(analyses: List[FunctionAnalysis]) -> List[int]:
+        """Count analyses per risk level in a single pass, in RiskLevel order."""
+        risk_counts = [0] * len(RISK_RANK)
+        for a in analyses:
+            risk_counts[RISK_RANK[a.risk_level]] += 1
+        return risk_counts
+
+    def _summary_prompt(
+        self, sorted_analyses: List[FunctionAnalysis], risk_counts: List[int]
+    ) -> str:
+        """Build the summary agent's user prompt from ranked analyses."""
+        critical, high, medium, low, info = risk_counts
+        return SUMMARY_PROMPT_TEMPLATE.format_map({
+            "total": len(sorted_analyses),
+            "real_handlers": len(sorted_analyses) - info,
+            "high_priority": critical + high,
+            "critical": critical,
+            "high": high,
+            "medium": medium,
+            "low": low,
+            "info": info,
+            "top_concerns": self._format_top_concerns(sorted_analyses[:10]),
+        })
+
+    async def _write_summary(self, summary_prompt: str, echo: bool = True) -> TriageSummary:
+        """
+        Run the summary agent.
 
-        result = await self.summary_agent.run(summary_prompt)
+        Args:
+            summary_prompt: Prompt from _summary_prompt()
+            echo: Stream the summary text to stdout as it's generated
 
-        # Override the findings with our sorted list
-        return PrioritizedFindings(
-            total_functions_analyzed=len(analyses),
-            high_priority_count=high_priority_count,
-            findings=sorted_analyses,
-            summary=result.output.summary,
-            recommendations=result.output.recommendations,
+        Returns:
+            The summary and recommendations
+        """
+        if not echo:
+            result = await self.summary_agent.run(summary_prompt)
+            return result.output
+
+        # Stream the summary so it renders while the model is still writing
+        async with self.summary_agent.run_stream(summary_prompt) as stream:
+            printed = 0
+            async for partial in stream.stream_output():
+                print(partial.summary[printed:], end="")
+                printed = len(partial.summary)
+            output = await stream.get_output()
+        print(output.summary[printed:])
+        return output
+
+    @staticmethod
+    def _top_concern_keys(analyses: List[FunctionAnalysis]) -> frozenset:
+        """Locations of the ten highest-risk analyses, as the summary prompt lists them."""
+        top = sorted(analyses, key=attrgetter("risk_level.rank"))[:10]
+        return frozenset(
+            (a.location.file_path, a.location.line_number) for a in top
         )
 
     def _format_top_concerns(self, top_analyses: List[FunctionAnalysis]) -> str:
@@ -287,213 +693,826 @@ Remember: This is TRIAGE only - vulnerability identification comes in the next p
         Returns:
             True if it's a false positive
         """
-        quick_prompt = f"""File: {finding.file_path}
-Framework: {finding.framework}
-
-Code:
-```{finding.language}
-{code_context[:500]}
-```
-
-Is this a REAL user input handler or FALSE_POSITIVE?"""
+        cache_key = None
+        if self.cache:
+            cache_key = self._fast_filter_cache_key(finding, code_context)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached == "FALSE_POSITIVE"
+
+        quick_prompt = FAST_FILTER_PROMPT_TEMPLATE.format_map({
+            "file_path": finding.file_path,
+            "framework": finding.framework,
+            "language": finding.language,
+            "code_context": self._clip_context(
+                code_context, FAST_FILTER_CONTEXT_CHARS, finding.code_snippet
+            ),
+        })
 
         try:
             result = await self.fast_filter.run(quick_prompt)
-            response = result.output.strip().upper()
-            return "FALSE_POSITIVE" in response or "FALSE" in response
+            is_false_positive = result.output.verdict == "FALSE_POSITIVE"
         except Exception:
             # If fast check fails, assume it's real (will do full analysis)
             return False
 
-    async def triage_all_findings_streaming(
+        if cache_key:
+            self.cache.put(cache_key, "FALSE_POSITIVE" if is_false_positive else "REAL")
+        return is_false_positive
+
+    def _fast_filter_cache_key(self, finding: AstGrepFinding, code_context: str) -> str:
+        """Cache key for a fast filter verdict (the file path is part of the prompt)."""
+        return TriageCache.make_key(
+            "fast",
+            self.fast_model_name,
+            PROMPT_VERSION,
+            finding.rule_id,
+            finding.framework,
+            finding.file_path,
+            code_context,
+        )
+
+    async def fast_check_false_positives_batch(
+        self, items: List[tuple[AstGrepFinding, str]]
+    ) -> List[bool]:
+        """
+        Quick false positive check for several findings in a single fast-model call.
+
+        Falls back to one ``fast_check_false_positive`` call per item if the
+        batched call fails.
+
+        Args:
+            items: (finding, code_context) pairs
+
+        Returns:
+            One flag per item, True if it's a false positive
+        """
+        if not items:
+            return []
+
+        flags: List[Optional[bool]] = [None] * len(items)
+        keys: List[Optional[str]] = [None] * len(items)
+        if self.cache:
+            for i, (finding, code_context) in enumerate(items):
+                keys[i] = self._fast_filter_cache_key(finding, code_context)
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    flags[i] = cached == "FALSE_POSITIVE"
+
+        # Only send findings without a cached verdict to the model
+        pending = [i for i, flag in enumerate(flags) if flag is None]
+        if not pending:
+            return flags
+
+        blocks = []
+        for n, i in enumerate(pending, 1):
+            finding, code_context = items[i]
+            blocks.append(
+                FAST_FILTER_BATCH_ITEM_TEMPLATE.format_map({
+                    "number": n,
+                    "file_path": finding.file_path,
+                    "framework": finding.framework,
+                    "language": finding.language,
+                    "code_context": self._clip_context(
+                        code_context, FAST_FILTER_CONTEXT_CHARS, finding.code_snippet
+                    ),
+                })
+            )
+        batch_prompt = "\n\n".join(blocks)
+
+        try:
+            result = await self.fast_filter_batch.run(batch_prompt)
+        except Exception:
+            # Batched call failed or didn't match the schema; check items one by one
+            results = await asyncio.gather(
+                *(self.fast_check_false_positive(*items[i]) for i in pending)
+            )
+            for i, is_false_positive in zip(pending, results):
+                flags[i] = is_false_positive
+            return flags
+
+        verdicts = {v.index: v.verdict for v in result.output.verdicts}
+        for n, i in enumerate(pending, 1):
+            verdict = verdicts.get(n)
+            # Snippets the model skipped are treated as REAL (full analysis decides)
+            flags[i] = verdict == "FALSE_POSITIVE"
+            if keys[i] and verdict:
+                self.cache.put(keys[i], verdict)
+
+        return flags
+
+    @staticmethod
+    def _clip_context(
+        code: str,
+        max_chars: int = CONTEXT_MAX_CHARS,
+        anchor: Optional[str] = None,
+    ) -> str:
+        """
+        Clip code context to a character budget, on line boundaries.
+
+        Starts at the matched node (decorators and signature) when it can be
+        found, drops import lines and keeps as much of the body as fits.
+        Clipping an already clipped context returns it unchanged.
+
+        Args:
+            code: Code context around the finding
+            max_chars: Maximum length of the result
+            anchor: Text ast-grep matched, used to locate the function start
+
+        Returns:
+            The code, or a clipped copy ending in a truncation marker
+        """
+        if len(code) <= max_chars:
+            return code
+
+        lines = code.splitlines(keepends=True)
+        start = 0
+        first_line = anchor.strip().split("\n", 1)[0].strip() if anchor else ""
+        if first_line:
+            for i, line in enumerate(lines):
+                if line.strip() == first_line:
+                    start = i
+                    break
+
+        # Leave room for the truncation marker
+        budget = max_chars - 40
+        kept = []
+        used = 0
+        for line in lines[start:]:
+            if IMPORT_LINE_RE.match(line):
+                continue
+            if used + len(line) > budget:
+                break
+            kept.append(line)
+            used += len(line)
+
+        if not kept:
+            kept = [lines[start][:budget] + "\n"]
+        kept.append(f"...truncated ({len(lines) - len(kept)} lines)...\n")
+        return "".join(kept)
+
+    @staticmethod
+    def _relocate(analysis: FunctionAnalysis, finding: AstGrepFinding) -> FunctionAnalysis:
+        """Copy an analysis so it points at another finding's location."""
+        return analysis.model_copy(
+            update={
+                "location": analysis.location.model_copy(
+                    update={
+                        "file_path": finding.file_path,
+                        "line_number": finding.line_number,
+                        "column": finding.column,
+                    }
+                )
+            }
+        )
+
+    async def _dedupe_findings(
         self,
         findings: List[AstGrepFinding],
         code_reader: callable,
-        max_real_handlers: int | None = None,
-    ):
+    ) -> tuple[List[tuple[AstGrepFinding, Optional[str]]], Dict[int, List[AstGrepFinding]]]:
         """
-        Triage findings and yield each analysis as it's completed (for streaming).
+        Collapse repeated findings so each distinct piece of code is triaged once.
+
+        Findings at an already-seen file:line are dropped. Code context for the
+        remaining locations is read in worker threads, in parallel, and findings
+        whose code context is identical become aliases of the first one.
 
         Args:
             findings: List of ast-grep findings
             code_reader: Function to read code context (file_path, line_num) -> str
-            max_real_handlers: Stop after finding this many real handlers (None = no limit)
 
-        Yields:
-            FunctionAnalysis objects as they're completed
+        Returns:
+            Tuple of (unique (finding, code_context) pairs, aliases keyed by
+            1-based index into the unique list)
         """
-        print(f"\nTriaging {len(findings)} potential user input handlers (streaming mode)...\n")
+        seen_locations = set()
+        located = []
+        for finding in findings:
+            location = (finding.file_path, finding.line_number)
+            if location not in seen_locations:
+                seen_locations.add(location)
+                located.append(finding)
+
+        # File reads are blocking; keep them off the event loop
+        contexts = await asyncio.gather(
+            *(
+                asyncio.to_thread(code_reader, f.file_path, f.line_number)
+                for f in located
+            )
+        )
 
-        real_handler_count = 0
-        fast_filtered_count = 0
-        total_analyzed = 0
+        index_by_hash: Dict[str, int] = {}
+        unique = []
+        aliases: Dict[int, List[AstGrepFinding]] = {}
+        for finding, code_context in zip(located, contexts):
+            if code_context:
+                code_context = self._clip_context(code_context, anchor=finding.code_snippet)
+                digest = hashlib.blake2b(
+                    code_context.encode("utf-8"), digest_size=16
+                ).hexdigest()
+                if digest in index_by_hash:
+                    aliases.setdefault(index_by_hash[digest], []).append(finding)
+                    continue
+                index_by_hash[digest] = len(unique) + 1
+
+            unique.append((finding, code_context))
+
+        return unique, aliases
+
+    def _fan_out(
+        self,
+        analysis: FunctionAnalysis,
+        duplicates: List[AstGrepFinding],
+    ) -> List[FunctionAnalysis]:
+        """
+        Return the analysis plus a relocated copy for each duplicate finding.
 
-        for i, finding in enumerate(findings, 1):
-            # Check if we've hit the quota for real handlers
-            if max_real_handlers and real_handler_count >= max_real_handlers:
-                print(
-                    f"\nReached quota of {max_real_handlers} real handlers. Stopping analysis."
-                )
-                break
+        With collapse_duplicates, only the analysis is returned and the
+        duplicate locations are recorded in its aliases.
+        """
+        if self.collapse_duplicates:
+            if duplicates:
+                analysis = analysis.model_copy(update={
+                    "aliases": [
+                        CodeLocation(
+                            file_path=dup.file_path,
+                            line_number=dup.line_number,
+                            column=dup.column,
+                        )
+                        for dup in duplicates
+                    ]
+                })
+            return [analysis]
+        return [analysis] + [self._relocate(analysis, dup) for dup in duplicates]
+
+    async def _fast_filter_chunk(
+        self,
+        chunk: List[tuple[AstGrepFinding, Optional[str]]],
+    ) -> List[bool]:
+        """
+        Fast-filter a chunk of findings in one call.
 
-            # Simplified progress indicator
-            progress = f"[{i}/{len(findings)}]"
+        Args:
+            chunk: (finding, code_context) pairs; code_context is None if unreadable
 
-            # Show what file is being scanned
-            print(
-                f"{progress} Scanning {finding.file_path}:{finding.line_number}...",
-                end=" ",
-                flush=True,
-            )
+        Returns:
+            is_false_positive per finding (False for unreadable ones)
+        """
+        readable = [(f, ctx) for f, ctx in chunk if ctx]
 
-            # Get code context
-            code_context = code_reader(finding.file_path, finding.line_number)
-            if not code_context:
-                print("⚠ Could not read code context, skipping")
-                continue
+        async with self._sem:
+            flags = iter(await self.fast_check_false_positives_batch(readable))
+
+        return [next(flags) if ctx else False for _, ctx in chunk]
+
+    async def _triage_one(
+        self,
+        index: int,
+        total: int,
+        finding: AstGrepFinding,
+        code_context: Optional[str],
+        chunk_task: Optional[asyncio.Task],
+        position: int,
+    ) -> tuple[int, Optional[FunctionAnalysis], Optional[str], str]:
+        """
+        Triage a single finding once its chunk has been fast-filtered.
+
+        Nothing is printed here; the caller reports the returned status once
+        per completion so stdout stays off the per-finding critical path.
 
+        Args:
+            index: 1-based position of the finding (for progress output)
+            total: Total number of findings being triaged
+            finding: The ast-grep finding
+            code_context: Code context around the finding, None if unreadable
+            chunk_task: Task running the batched fast filter for this finding's
+                chunk, or None if the fast filter is skipped for it
+            position: Position of the finding within its chunk
+
+        Returns:
+            Tuple of (index, analysis or None, filter that settled it without
+            full triage ("static", "fast" or None), short status for progress output)
+        """
+        static_reason = self._static_false_positive_reason(finding, code_context)
+        if static_reason:
+            analysis = self._static_info_analysis(finding, static_reason)
+            return index, analysis, "static", f"○ False positive (static filter: {static_reason})"
+
+        if not code_context:
+            return index, None, None, "⚠ Could not read code context, skipping"
+
+        if chunk_task is not None:
             try:
-                # Fast filter check first (using cheap model)
-                is_false_positive = await self.fast_check_false_positive(
-                    finding, code_context
-                )
+                is_false_positive = (await chunk_task)[position]
+            except Exception as e:
+                return index, None, None, f"✗ Error: {e}"
+
+            if is_false_positive:
+                return index, None, "fast", "○ False positive (fast filter)"
+
+        async with self._sem:
+            try:
+                if self.cascade:
+                    # Cheap first pass; only high-risk real handlers get the main model
+                    analysis = await self.triage_function(finding, code_context, fast=True)
+                    if (
+                        analysis.is_real_handler
+                        and analysis.risk_level in (RiskLevel.CRITICAL, RiskLevel.HIGH)
+                        and self.fast_model_name != self.model_name
+                    ):
+                        analysis = await self.triage_function(finding, code_context)
+                else:
+                    # If it passed fast filter, do full analysis with GPT-5
+                    analysis = await self.triage_function(finding, code_context)
+            except Exception as e:
+                return index, None, None, f"✗ Error: {e}"
+
+        if analysis.risk_level != RiskLevel.INFO:
+            status = f"✓ {analysis.risk_level.value.upper()}: {analysis.function_name}"
+        else:
+            status = "○ False positive (detailed)"
 
-                if is_false_positive:
-                    fast_filtered_count += 1
-                    print("○ False positive (fast filter)")
-                    continue  # Skip full analysis
+        return index, analysis, None, status
 
-                # If it passed fast filter, do full analysis with GPT-5
-                analysis = await self.triage_function(finding, code_context)
-                total_analyzed += 1
+    def _schedule_triage(
+        self,
+        unique: List[tuple[AstGrepFinding, Optional[str]]],
+    ) -> tuple[List[asyncio.Task], List[asyncio.Task]]:
+        """
+        Create the fast-filter chunk tasks and one triage task per unique finding.
+
+        Only findings that need the fast filter are batched into chunks:
+        static false positives and HIGH_CONFIDENCE_RULES matches skip it, and in
+        cascade mode no fast-filter chunks are created at all.
 
-                # Show result on same line
-                if analysis.risk_level != RiskLevel.INFO:
-                    real_handler_count += 1
-                    print(
-                        f"✓ {analysis.risk_level.value.upper()}: {analysis.function_name}"
+        Returns:
+            Tuple of (per-finding triage tasks, fast-filter chunk tasks)
+        """
+        needs_filter = []
+        tasks = []
+        for index, (finding, code_context) in enumerate(unique, 1):
+            if self.cascade or not self._needs_fast_filter(finding, code_context):
+                tasks.append(
+                    asyncio.create_task(
+                        self._triage_one(index, len(unique), finding, code_context, None, 0)
                     )
-                else:
-                    print("○ False positive (detailed)")
+                )
+            else:
+                needs_filter.append((index, finding, code_context))
+
+        size = self.fast_filter_batch_size
+        chunk_tasks = []
+        for start in range(0, len(needs_filter), size):
+            members = needs_filter[start:start + size]
+            chunk_task = asyncio.create_task(
+                self._fast_filter_chunk([(f, ctx) for _, f, ctx in members])
+            )
+            chunk_tasks.append(chunk_task)
+            for position, (index, finding, code_context) in enumerate(members):
+                tasks.append(
+                    asyncio.create_task(
+                        self._triage_one(
+                            index,
+                            len(unique),
+                            finding,
+                            code_context,
+                            chunk_task,
+                            position,
+                        )
+                    )
+                )
+        return tasks, chunk_tasks
 
-                # Yield the analysis immediately for streaming
-                yield analysis
+    def _static_false_positive_reason(
+        self, finding: AstGrepFinding, code_context: Optional[str]
+    ) -> Optional[str]:
+        """
+        Cheap regex checks for findings that are obviously not handlers.
 
-            except Exception as e:
-                print(f"✗ Error: {e}")
-                continue
+        Args:
+            finding: The ast-grep finding
+            code_context: Code context around the finding, None if unreadable
+
+        Returns:
+            Short reason if the finding is a false positive, None otherwise
+        """
+        if self.PATH_DENYLIST_RE.search(finding.file_path.replace("\\", "/")):
+            return "test or config file"
+
+        if code_context and not is_plausible_handler(
+            code_context.encode("utf-8"), finding.language
+        ):
+            return "no request-handling keywords"
+
+        if finding.framework not in self.CALL_STYLE_FRAMEWORKS or not finding.code_snippet:
+            return None
+
+        call = finding.code_snippet.lstrip().split("\n", 1)[0]
+        if self.CLIENT_CALL_RE.match(call):
+            return "HTTP client or cache call"
+        # Koa routers accept a route name before the path, and Echo tolerates
+        # paths without a leading slash
+        if finding.framework not in ("Koa", "Echo") and self.NON_PATH_LITERAL_RE.match(call):
+            return "first argument is not a route path"
+        return None
+
+    def _needs_fast_filter(self, finding: AstGrepFinding, code_context: Optional[str]) -> bool:
+        """Whether the finding should go through the fast filter before full triage."""
+        if self._static_false_positive_reason(finding, code_context):
+            return False
+        return (finding.framework, finding.rule_id) not in self.HIGH_CONFIDENCE_RULES
+
+    @staticmethod
+    def _static_info_analysis(finding: AstGrepFinding, reason: str) -> FunctionAnalysis:
+        """Build an INFO analysis for a finding rejected without an LLM call."""
+        return FunctionAnalysis(
+            is_real_handler=False,
+            function_name=f"{finding.file_path}:{finding.line_number}",
+            location=CodeLocation(
+                file_path=finding.file_path,
+                line_number=finding.line_number,
+                column=finding.column,
+            ),
+            framework=finding.framework,
+            language=finding.language,
+            accepts_unauthenticated_input=False,
+            risk_level=RiskLevel.INFO,
+            reasoning=f"Skipped by static filter: {reason}.",
+        )
+
+    @staticmethod
+    async def _cancel_pending(tasks: List[asyncio.Task]) -> None:
+        """Cancel any unfinished triage tasks and wait for them to unwind."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _iter_analyses(
+        self,
+        findings: List[AstGrepFinding],
+        code_reader: callable,
+        max_real_handlers: int | None = None,
+        stats: Optional[Dict[str, int]] = None,
+        progress: Optional[callable] = None,
+    ) -> AsyncIterator[FunctionAnalysis]:
+        """
+        Triage findings concurrently and yield analyses in completion order.
+
+        Nothing is printed; callers that want output pass ``progress`` and
+        read ``stats`` afterwards.
+
+        Args:
+            findings: List of ast-grep findings
+            code_reader: Function to read code context (file_path, line_num) -> str
+            max_real_handlers: Stop after finding this many real handlers (None = no limit)
+            stats: Optional dict filled with run counters (duplicates, unique,
+                completed, static_filtered, fast_filtered, deep_analyzed,
+                real_handlers, quota_reached)
+            progress: Optional callback (index, total, finding, status) invoked
+                once per completed finding
+
+        Yields:
+            FunctionAnalysis objects as they're completed
+        """
+        if stats is None:
+            stats = {}
+
+        unique, aliases = await self._dedupe_findings(findings, code_reader)
+        stats.update(
+            duplicates=len(findings) - len(unique),
+            unique=len(unique),
+            completed=0,
+            static_filtered=0,
+            fast_filtered=0,
+            deep_analyzed=0,
+            real_handlers=0,
+            quota_reached=False,
+        )
+
+        tasks, chunk_tasks = self._schedule_triage(unique)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, analysis, filtered, status = await next_done
+                stats["completed"] += 1
+                if progress is not None:
+                    progress(index, len(unique), unique[index - 1][0], status)
+
+                if filtered == "fast":
+                    stats["fast_filtered"] += 1
+                elif filtered == "static":
+                    stats["static_filtered"] += 1
+                if analysis is None:
+                    continue
+
+                if filtered is None:
+                    stats["deep_analyzed"] += 1
+                for result in self._fan_out(analysis, aliases.get(index, [])):
+                    if result.risk_level != RiskLevel.INFO:
+                        stats["real_handlers"] += 1
+
+                    yield result
+
+                    # Check if we've hit the quota for real handlers
+                    if max_real_handlers and stats["real_handlers"] >= max_real_handlers:
+                        stats["quota_reached"] = True
+                        return
+        finally:
+            await self._cancel_pending(tasks + chunk_tasks)
+
+    @staticmethod
+    def _print_triage_summary(
+        title: str,
+        stats: Dict[str, int],
+        max_real_handlers: int | None,
+        analyses: Optional[List[FunctionAnalysis]] = None,
+    ) -> None:
+        """Print the end-of-run summary for the CLI wrappers."""
+        if stats.get("quota_reached"):
+            print(f"\nReached quota of {max_real_handlers} real handlers. Stopping analysis.")
 
-        # Print final summary
         print(f"\n{'='*60}")
-        print(f"Streaming Analysis Complete:")
-        print(f"  Total scanned: {i} files")
-        print(f"  Fast filtered (cheap): {fast_filtered_count}")
-        print(f"  Deep analyzed (GPT-5): {total_analyzed}")
-        print(f"  Real handlers found: {real_handler_count}")
+        print(f"{title}:")
+        if stats.get("duplicates"):
+            print(f"  Duplicates collapsed: {stats['duplicates']}")
+        print(f"  Total scanned: {stats.get('completed', 0)} files")
+        print(f"  Static filtered (no LLM): {stats.get('static_filtered', 0)}")
+        print(f"  Fast filtered (cheap): {stats.get('fast_filtered', 0)}")
+        print(f"  Deep analyzed (GPT-5): {stats.get('deep_analyzed', 0)}")
+        print(f"  Real handlers found: {stats.get('real_handlers', 0)}")
+        if analyses is not None:
+            risk_counts = SecurityTriageAgent._count_risk_levels(analyses)
+            print(f"  False positives (detailed): {risk_counts[RISK_RANK[RiskLevel.INFO]]}")
+            if len(analyses) > risk_counts[RISK_RANK[RiskLevel.INFO]]:
+                print(f"  Risk breakdown:")
+                for risk, count in zip(RiskLevel, risk_counts):
+                    if risk != RiskLevel.INFO and count:
+                        print(f"    {risk.value.upper()}: {count}")
         print(f"{'='*60}\n")
 
-    async def triage_all_findings(
+    async def triage_all_findings_streaming(
         self,
         findings: List[AstGrepFinding],
         code_reader: callable,
         max_real_handlers: int | None = None,
-    ) -> PrioritizedFindings:
+        verbose: bool = True,
+    ) -> AsyncIterator[FunctionAnalysis]:
         """
-        Triage all findings and create prioritized review list.
+        Triage findings and yield each analysis as it's completed (for streaming).
+
+        Findings are triaged concurrently (see ``concurrency``), so analyses are
+        yielded in completion order rather than input order.
 
         Args:
             findings: List of ast-grep findings
             code_reader: Function to read code context (file_path, line_num) -> str
             max_real_handlers: Stop after finding this many real handlers (None = no limit)
+            verbose: Print progress and a final summary
 
-        Returns:
-            Complete prioritized triage report
+        Yields:
+            FunctionAnalysis objects as they're completed
         """
-        print(f"\nTriaging {len(findings)} potential user input handlers...\n")
+        if not verbose:
+            async with aclosing(
+                self._iter_analyses(findings, code_reader, max_real_handlers)
+            ) as results:
+                async for analysis in results:
+                    yield analysis
+            return
 
-        analyses = []
-        real_handler_count = 0
-        fast_filtered_count = 0
-
-        for i, finding in enumerate(findings, 1):
-            # Check if we've hit the quota for real handlers
-            if max_real_handlers and real_handler_count >= max_real_handlers:
-                print(
-                    f"\nReached quota of {max_real_handlers} real handlers. Stopping analysis."
-                )
-                break
+        print(f"\nTriaging {len(findings)} potential user input handlers (streaming mode)...\n")
+
+        stats: Dict[str, int] = {}
+        printer = _ProgressPrinter()
+        try:
+            async with aclosing(
+                self._iter_analyses(findings, code_reader, max_real_handlers, stats, printer)
+            ) as results:
+                async for analysis in results:
+                    # Yield the analysis immediately for streaming
+                    yield analysis
+        finally:
+            printer.close()
+
+        self._print_triage_summary("Streaming Analysis Complete", stats, max_real_handlers)
+
+    async def triage_all_findings_batch(
+        self,
+        findings: List[AstGrepFinding],
+        code_reader: callable,
+        poll_interval: float = BATCH_POLL_INTERVAL_SECONDS,
+    ) -> AsyncIterator[FunctionAnalysis]:
+        """
+        Triage findings through the OpenAI Batch API and yield the analyses.
 
-            # Simplified progress indicator
-            progress = f"[{i}/{len(findings)}]"
+        Trades latency for cost and throughput. Every finding that passes the
+        static filter goes straight to full triage on the main model, with no
+        fast filter, as one batch job. Cached results and static false
+        positives are yielded before the job is submitted.
 
-            # Show what file is being scanned
-            print(
-                f"{progress} Scanning {finding.file_path}:{finding.line_number}...",
-                end=" ",
-                flush=True,
-            )
+        Args:
+            findings: List of ast-grep findings
+            code_reader: Function to read code context (file_path, line_num) -> str
+            poll_interval: Seconds between batch status checks
+
+        Yields:
+            FunctionAnalysis objects, cached/static ones first
+        """
+        provider, _, model_name = self.model_name.partition(":")
+        if provider != "openai":
+            raise ValueError(f"Batch mode requires an openai: model, got {self.model_name}")
+
+        from openai import AsyncOpenAI
+
+        print(f"\nTriaging {len(findings)} potential user input handlers (batch mode)...\n")
 
-            # Get code context
-            code_context = code_reader(finding.file_path, finding.line_number)
+        unique, aliases = await self._dedupe_findings(findings, code_reader)
+
+        # custom_id -> (index, finding, deployment context, cache key)
+        pending: Dict[str, tuple] = {}
+        request_lines = []
+        for index, (finding, code_context) in enumerate(unique, 1):
+            static_reason = self._static_false_positive_reason(finding, code_context)
+            if static_reason:
+                analysis = self._static_info_analysis(finding, static_reason)
+                for result in self._fan_out(analysis, aliases.get(index, [])):
+                    yield result
+                continue
             if not code_context:
-                print("⚠ Could not read code context, skipping")
                 continue
 
-            try:
-                # Fast filter check first (using cheap model)
-                is_false_positive = await self.fast_check_false_positive(
-                    finding, code_context
+            deployment_ctx = None
+            if self.deployment_parser:
+                deployment_ctx = self.deployment_parser.get_deployment_context(finding.file_path)
+
+            cache_key = None
+            if self.cache:
+                cache_key = self._triage_cache_key(
+                    finding, code_context, deployment_ctx, self.model_name
                 )
+                cached = self.cache.get(cache_key)
+                if cached:
+                    analysis = self._relocate(
+                        FunctionAnalysis.model_validate_json(cached), finding
+                    )
+                    analysis.deployment_context = deployment_ctx
+                    for result in self._fan_out(analysis, aliases.get(index, [])):
+                        yield result
+                    continue
+
+            custom_id = str(index)
+            pending[custom_id] = (index, finding, deployment_ctx, cache_key)
+            request_lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model_name,
+                    "messages": [
+                        {"role": "system", "content": USER_INPUT_TRIAGE_SYSTEM_PROMPT},
+                        {
+                            "role": "user",
+                            "content": self._triage_prompt(finding, code_context, deployment_ctx),
+                        },
+                    ],
+                    "response_format": {
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": "FunctionAnalysis",
+                            "schema": FunctionAnalysis.model_json_schema(),
+                        },
+                    },
+                },
+            }))
+
+        if not request_lines:
+            return
+
+        client = AsyncOpenAI(
+            api_key=self._api_key, http_client=self._http, max_retries=MAX_RETRIES
+        )
+        batch_input = await client.files.create(
+            file=("triage_batch.jsonl", "\n".join(request_lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        print(f"Submitted batch {batch.id} with {len(request_lines)} findings")
 
-                if is_false_positive:
-                    fast_filtered_count += 1
-                    print("○ False positive (fast filter)")
-                    continue  # Skip full analysis
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            batch = await client.batches.retrieve(batch.id)
 
-                # If it passed fast filter, do full analysis with GPT-5
-                analysis = await self.triage_function(finding, code_context)
-                analyses.append(analysis)
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"Warning: batch {batch.id} ended with status {batch.status}")
+            return
 
-                # Show result on same line
-                if analysis.risk_level != RiskLevel.INFO:
-                    real_handler_count += 1
-                    print(
-                        f"✓ {analysis.risk_level.value.upper()}: {analysis.function_name}"
-                    )
-                else:
-                    print("○ False positive (detailed)")
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index, finding, deployment_ctx, cache_key = pending[record["custom_id"]]
+            response = record.get("response") or {}
+            location = f"{finding.file_path}:{finding.line_number}"
+            if response.get("status_code") != 200:
+                print(f"Warning: {location} failed in batch: {record.get('error')}")
+                continue
 
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                analysis = FunctionAnalysis.model_validate_json(content)
             except Exception as e:
-                print(f"✗ Error: {e}")
+                print(f"Warning: {location} returned an invalid analysis: {e}")
                 continue
 
-        # Print summary
-        real_handlers = [a for a in analyses if a.risk_level != RiskLevel.INFO]
-        false_positives = [a for a in analyses if a.risk_level == RiskLevel.INFO]
+            analysis = self._finalize_analysis(analysis, deployment_ctx, cache_key)
+            for result in self._fan_out(analysis, aliases.get(index, [])):
+                yield result
 
-        print(f"\n{'='*60}")
-        print(f"Triage Summary:")
-        print(f"  Total scanned: {i} files")
-        print(f"  Fast filtered (cheap): {fast_filtered_count}")
-        print(f"  Deep analyzed (GPT-5): {len(analyses)}")
-        print(f"  Real handlers found: {len(real_handlers)}")
-        print(f"  False positives (detailed): {len(false_positives)}")
-        if real_handlers:
-            risk_breakdown = {}
-            for a in real_handlers:
-                risk_breakdown[a.risk_level] = risk_breakdown.get(a.risk_level, 0) + 1
-            print(f"  Risk breakdown:")
-            for risk in [
-                RiskLevel.CRITICAL,
-                RiskLevel.HIGH,
-                RiskLevel.MEDIUM,
-                RiskLevel.LOW,
-            ]:
-                if risk in risk_breakdown:
-                    print(f"    {risk.value.upper()}: {risk_breakdown[risk]}")
-        print(f"{'='*60}\n")
+    async def triage_all_findings(
+        self,
+        findings: List[AstGrepFinding],
+        code_reader: callable,
+        max_real_handlers: int | None = None,
+        verbose: bool = True,
+    ) -> PrioritizedFindings:
+        """
+        Triage all findings and create prioritized review list.
+
+        The summary call is started once SUMMARY_OVERLAP_FRACTION of the
+        findings have completed, so it overlaps the tail of triage. Its text is
+        kept only if the late arrivals leave both the top concerns and the
+        per-level counts quoted in its prompt unchanged; otherwise it is
+        cancelled and re-issued over the full set of analyses.
 
-        print("Creating prioritized triage report...")
-        prioritized = await self.prioritize_findings(analyses)
+        Args:
+            findings: List of ast-grep findings
+            code_reader: Function to read code context (file_path, line_num) -> str
+            max_real_handlers: Stop after finding this many real handlers (None = no limit)
+            verbose: Print progress and a final summary
+
+        Returns:
+            Complete prioritized triage report
+        """
+        if verbose:
+            print(f"\nTriaging {len(findings)} potential user input handlers...\n")
+
+        stats: Dict[str, int] = {}
+        printer = _ProgressPrinter() if verbose else None
+        analyses = []
+        early_summary = None
+        early_top = None
+        early_counts = None
+        try:
+            async with aclosing(
+                self._iter_analyses(findings, code_reader, max_real_handlers, stats, printer)
+            ) as results:
+                async for analysis in results:
+                    analyses.append(analysis)
+                    if (
+                        early_summary is None
+                        and stats["completed"] >= SUMMARY_OVERLAP_FRACTION * stats["unique"]
+                    ):
+                        early_top = self._top_concern_keys(analyses)
+                        ranked, early_counts = self._rank_analyses(analyses)
+                        early_summary = asyncio.create_task(
+                            self._write_summary(
+                                self._summary_prompt(ranked, early_counts),
+                                echo=False,
+                            )
+                        )
+        except BaseException:
+            if early_summary is not None:
+                await self._cancel_pending([early_summary])
+            raise
+        finally:
+            if printer is not None:
+                printer.close()
+
+        if verbose:
+            self._print_triage_summary("Triage Summary", stats, max_real_handlers, analyses)
+            print("Creating prioritized triage report...")
+
+        summary = None
+        if early_summary is not None:
+            # The counts sum to the total, so this also checks the item count
+            if (
+                self._top_concern_keys(analyses) == early_top
+                and self._count_risk_levels(analyses) == early_counts
+            ):
+                try:
+                    summary = await early_summary
+                except Exception:
+                    # Re-issue below over the full set of analyses
+                    summary = None
+                else:
+                    if verbose:
+                        print(summary.summary)
+            else:
+                await self._cancel_pending([early_summary])
 
-        return prioritized
+        return await self.prioritize_findings(analyses, summary=summary, echo=verbose)
@@ -10,17 +10,50 @@ import argparse
 import asyncio
 import json
 import sys
+from collections import Counter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 
-from scanner import AstGrepScanner
-from agent import SecurityTriageAgent
-from models import RiskLevel
-
 try:
-    from deployment_parser import DeploymentModelParser
+    import orjson
 except ImportError:
-    DeploymentModelParser = None
+    orjson = None
+
+# The scanner, agent and model modules pull in pydantic and the LLM SDKs;
+# they're imported where first needed so --help and argument errors stay fast
+
+# Report separators, built once
+_EQ80 = "=" * 80
+_DASH80 = "-" * 80
+
+# Markdown heading marker per risk level. Keyed by RiskLevel value (RiskLevel
+# is a str enum, so members look up by value) to keep models out of the
+# module-level imports.
+_RISK_EMOJI = MappingProxyType({
+    "critical": "🔴",
+    "high": "🟠",
+    "medium": "🟡",
+    "low": "🔵",
+    "info": "⚪",
+})
+
+
+def dump_json(model, indent: bool = False) -> bytes:
+    """
+    Serialize a pydantic model to JSON bytes, with orjson when it's installed.
+
+    Args:
+        model: Pydantic model to serialize
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(model.model_dump(mode="json"), option=option)
+    return model.model_dump_json(indent=2 if indent else None).encode()
 
 
 def parse_args():
@@ -51,7 +84,7 @@ Environment Variables:
     parser.add_argument(
         "--target",
         type=Path,
-        default=Path.cwd(),
+        default=None,
         help="Target codebase directory to analyze (default: current directory)",
     )
 
@@ -90,7 +123,10 @@ Environment Variables:
     parser.add_argument(
         "--max-findings",
         type=int,
-        help="Maximum number of findings to analyze (for testing)",
+        help=(
+            "Maximum number of findings to analyze (for testing). With "
+            "--max-real-handlers, the most handler-like findings are kept"
+        ),
     )
 
     parser.add_argument(
@@ -118,340 +154,341 @@ Environment Variables:
         help="Enable debug logging for deployment context matching",
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the on-disk cache of LLM triage results",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Maximum number of findings triaged concurrently (default: 10)",
+    )
+
+    parser.add_argument(
+        "--collapse-duplicates",
+        action="store_true",
+        help="Report identical code found at several locations once, listing the other locations",
+    )
+
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit triage as one OpenAI Batch API job (jsonl format only; cheaper, but can take hours)",
+    )
+
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Triage with the fast model first and re-run only CRITICAL/HIGH handlers on --model (skips the separate fast filter)",
+    )
+
     return parser.parse_args()
 
 
-def format_output_text(findings, args):
-    """Format findings as human-readable text."""
-    output = []
+def partition_findings(findings, min_risk):
+    """
+    Filter, count and sort findings for the report in a single pass.
+
+    "info", the CLI default, is treated as "low" so INFO (false
+    positives) is left out of the detailed findings.
+
+    Args:
+        findings: PrioritizedFindings from the agent
+        min_risk: Minimum risk level name from --min-risk
+
+    Returns:
+        Tuple of (findings at or above the minimum risk, highest first;
+        false positive count; Counter of findings per risk level)
+    """
+    from models import RISK_RANK
+
+    # Default to LOW if user didn't specify, to exclude INFO
+    default_min_risk = "low" if min_risk == "info" else min_risk
+    # RiskLevel is a str enum, so RISK_RANK looks up the name directly
+    min_risk_value = RISK_RANK[default_min_risk]
+
+    kept = []
+    risk_counts = Counter()
+    for f in findings.findings:
+        risk_counts[f.risk_level] += 1
+        if RISK_RANK[f.risk_level] <= min_risk_value:
+            kept.append(f)
+
+    kept.sort(key=lambda f: RISK_RANK[f.risk_level])
+    return kept, risk_counts["info"], risk_counts
+
+
+def iter_output_text(findings, args):
+    """Format findings as human-readable text, yielding one line at a time."""
+    from models import RiskLevel
 
     # Header
-    output.append("=" * 80)
-    output.append("SECURITY TRIAGE REPORT - USER INPUT HANDLERS")
-    output.append("=" * 80)
-    output.append("")
+    yield _EQ80
+    yield "SECURITY TRIAGE REPORT - USER INPUT HANDLERS"
+    yield _EQ80
+    yield ""
 
     # Summary
-    output.append("TRIAGE SUMMARY")
-    output.append("-" * 80)
-    output.append(findings.summary)
-    output.append("")
+    yield "TRIAGE SUMMARY"
+    yield _DASH80
+    yield findings.summary
+    yield ""
 
     # Statistics
-    output.append("STATISTICS")
-    output.append("-" * 80)
-    output.append(f"Total Functions Analyzed: {findings.total_functions_analyzed}")
-    output.append(f"High Priority (CRITICAL + HIGH): {findings.high_priority_count}")
-    output.append("")
-
-    risk_counts = {}
-    for analysis in findings.findings:
-        risk_counts[analysis.risk_level] = risk_counts.get(analysis.risk_level, 0) + 1
-
-    output.append("Risk Level Breakdown:")
-    for risk_level in [
-        RiskLevel.CRITICAL,
-        RiskLevel.HIGH,
-        RiskLevel.MEDIUM,
-        RiskLevel.LOW,
-        RiskLevel.INFO,
-    ]:
-        count = risk_counts.get(risk_level, 0)
-        output.append(f"  {risk_level.value.upper():8s}: {count}")
-    output.append("")
+    yield "STATISTICS"
+    yield _DASH80
+    yield f"Total Functions Analyzed: {findings.total_functions_analyzed}"
+    yield f"High Priority (CRITICAL + HIGH): {findings.high_priority_count}"
+    yield ""
+
+    filtered_findings, false_positives_count, risk_counts = partition_findings(
+        findings, args.min_risk
+    )
+
+    yield "Risk Level Breakdown:"
+    for risk_level in RiskLevel:
+        count = risk_counts[risk_level]
+        yield f"  {risk_level.value.upper():8s}: {count}"
+    yield ""
 
     # Recommendations
     if findings.recommendations:
-        output.append("RECOMMENDATIONS")
-        output.append("-" * 80)
+        yield "RECOMMENDATIONS"
+        yield _DASH80
         for i, rec in enumerate(findings.recommendations, 1):
-            output.append(f"{i}. {rec}")
-        output.append("")
-
-    # Filter findings by minimum risk level
-    # By default, exclude INFO (false positives) unless user explicitly requested them
-    risk_order = {
-        RiskLevel.CRITICAL: 0,
-        RiskLevel.HIGH: 1,
-        RiskLevel.MEDIUM: 2,
-        RiskLevel.LOW: 3,
-        RiskLevel.INFO: 4,
-    }
-
-    # Default to LOW if user didn't specify, to exclude INFO
-    default_min_risk = "low" if args.min_risk == "info" else args.min_risk
-    min_risk_level = RiskLevel(default_min_risk)
-    min_risk_value = risk_order[min_risk_level]
-
-    filtered_findings = [
-        f for f in findings.findings if risk_order[f.risk_level] <= min_risk_value
-    ]
-
-    # Count how many were filtered out as false positives
-    false_positives_count = sum(
-        1 for f in findings.findings if f.risk_level == RiskLevel.INFO
-    )
+            yield f"{i}. {rec}"
+        yield ""
 
     # Detailed Findings
     if false_positives_count > 0:
-        output.append(
+        yield (
             f"DETAILED FINDINGS (Showing {len(filtered_findings)} real handlers, filtered {false_positives_count} false positives)"
         )
     else:
-        output.append(
+        yield (
             f"DETAILED FINDINGS (Showing {len(filtered_findings)}/{len(findings.findings)})"
         )
-    output.append("=" * 80)
-    output.append("")
+    yield _EQ80
+    yield ""
 
     if len(filtered_findings) == 0:
-        output.append("No user input handlers found at the requested priority level.")
-        output.append("")
+        yield "No user input handlers found at the requested priority level."
+        yield ""
         if false_positives_count > 0:
-            output.append(
+            yield (
                 f"Note: {false_positives_count} items were identified as false positives (config, tests, utilities)."
             )
-            output.append("Use --min-risk info to see them.")
-        output.append("")
-        return "\n".join(output)
+            yield "Use --min-risk info to see them."
+        yield ""
+        return
 
     for i, analysis in enumerate(filtered_findings, 1):
-        output.append(
+        yield (
             f"[{i}] {analysis.risk_level.value.upper()} - {analysis.function_name}"
         )
-        output.append("-" * 80)
-        output.append(
+        yield _DASH80
+        yield (
             f"Location: {analysis.location.file_path}:{analysis.location.line_number}"
         )
-        output.append(f"Framework: {analysis.framework} ({analysis.language})")
+        for alias in analysis.aliases:
+            yield f"Also at: {alias.file_path}:{alias.line_number}"
+        yield f"Framework: {analysis.framework} ({analysis.language})"
 
         if analysis.endpoint_path:
-            output.append(f"Endpoint: {analysis.endpoint_path}")
+            yield f"Endpoint: {analysis.endpoint_path}"
 
         if analysis.http_methods:
-            output.append(f"Methods: {', '.join(analysis.http_methods)}")
+            yield f"Methods: {', '.join(analysis.http_methods)}"
 
-        output.append(
+        yield (
             f"Unauthenticated Input: {'YES' if analysis.accepts_unauthenticated_input else 'NO'}"
         )
 
         if analysis.input_sources:
             sources = ", ".join(s.value for s in analysis.input_sources)
-            output.append(f"Input Sources: {sources}")
+            yield f"Input Sources: {sources}"
 
         # Display deployment context if available
         if analysis.deployment_context:
-            output.append("")
-            output.append("Deployment Context:")
+            yield ""
+            yield "Deployment Context:"
             ctx = analysis.deployment_context
             if ctx.service_name:
-                output.append(f"  Service: {ctx.service_name}")
+                yield f"  Service: {ctx.service_name}"
             if ctx.trust_zone:
-                output.append(f"  Trust Zone: {ctx.trust_zone}")
+                yield f"  Trust Zone: {ctx.trust_zone}"
             if ctx.network_exposure:
-                output.append(f"  Network Exposure: {ctx.network_exposure}")
+                yield f"  Network Exposure: {ctx.network_exposure}"
             if ctx.deployment_target:
-                output.append(f"  Deployment Target: {ctx.deployment_target}")
+                yield f"  Deployment Target: {ctx.deployment_target}"
             if ctx.authentication_method:
-                output.append(f"  Auth Method: {ctx.authentication_method}")
+                yield f"  Auth Method: {ctx.authentication_method}"
             if ctx.upstream_services:
-                output.append(f"  Upstream: {', '.join(ctx.upstream_services)}")
+                yield f"  Upstream: {', '.join(ctx.upstream_services)}"
             if ctx.downstream_services:
-                output.append(f"  Downstream: {', '.join(ctx.downstream_services)}")
+                yield f"  Downstream: {', '.join(ctx.downstream_services)}"
 
-        output.append("")
-        output.append("Security Assessment:")
+        yield ""
+        yield "Security Assessment:"
 
         if analysis.security_concerns:
-            output.append("  Concerns:")
+            yield "  Concerns:"
             for concern in analysis.security_concerns:
                 conf_pct = int(concern.confidence * 100)
-                output.append(
+                yield (
                     f"    - [{concern.vulnerability_type.value}] {concern.description} ({conf_pct}% confidence)"
                 )
         else:
-            output.append("  No specific concerns identified")
+            yield "  No specific concerns identified"
 
-        output.append("")
-        output.append("  Security Controls:")
-        output.append(
+        yield ""
+        yield "  Security Controls:"
+        yield (
             f"    Input Validation: {'Present' if analysis.has_input_validation else 'Missing' if analysis.has_input_validation is False else 'Unknown'}"
         )
-        output.append(
+        yield (
             f"    Sanitization: {'Present' if analysis.has_sanitization else 'Missing' if analysis.has_sanitization is False else 'Unknown'}"
         )
-        output.append(
+        yield (
             f"    Authorization: {'Present' if analysis.has_authorization_check else 'Missing' if analysis.has_authorization_check is False else 'Unknown'}"
         )
 
-        output.append("")
-        output.append("Reasoning:")
-        output.append(f"  {analysis.reasoning}")
+        yield ""
+        yield "Reasoning:"
+        yield f"  {analysis.reasoning}"
 
-        output.append("")
-        output.append("")
+        yield ""
+        yield ""
 
-    return "\n".join(output)
 
+def iter_output_markdown(findings, args):
+    """Format findings as Markdown, yielding one line at a time."""
+    from models import RiskLevel
 
-def format_output_markdown(findings, args):
-    """Format findings as Markdown."""
-    output = []
-
-    output.append("# Security Analysis Report - User Input Handlers\n")
+    yield "# Security Analysis Report - User Input Handlers\n"
 
     # Summary
-    output.append("## Executive Summary\n")
-    output.append(findings.summary + "\n")
+    yield "## Executive Summary\n"
+    yield f"{findings.summary}\n"
 
     # Statistics
-    output.append("## Statistics\n")
-    output.append(
+    yield "## Statistics\n"
+    yield (
         f"- **Total Functions Analyzed**: {findings.total_functions_analyzed}"
     )
-    output.append(
+    yield (
         f"- **High Priority (CRITICAL + HIGH)**: {findings.high_priority_count}\n"
     )
 
-    risk_counts = {}
-    for analysis in findings.findings:
-        risk_counts[analysis.risk_level] = risk_counts.get(analysis.risk_level, 0) + 1
-
-    output.append("### Risk Level Breakdown\n")
-    for risk_level in [
-        RiskLevel.CRITICAL,
-        RiskLevel.HIGH,
-        RiskLevel.MEDIUM,
-        RiskLevel.LOW,
-        RiskLevel.INFO,
-    ]:
-        count = risk_counts.get(risk_level, 0)
-        output.append(f"- **{risk_level.value.upper()}**: {count}")
-    output.append("")
+    filtered_findings, false_positives_count, risk_counts = partition_findings(
+        findings, args.min_risk
+    )
+
+    yield "### Risk Level Breakdown\n"
+    for risk_level in RiskLevel:
+        count = risk_counts[risk_level]
+        yield f"- **{risk_level.value.upper()}**: {count}"
+    yield ""
 
     # Recommendations
     if findings.recommendations:
-        output.append("## Recommendations\n")
+        yield "## Recommendations\n"
         for i, rec in enumerate(findings.recommendations, 1):
-            output.append(f"{i}. {rec}")
-        output.append("")
-
-    # Detailed Findings
-    risk_order = {
-        RiskLevel.CRITICAL: 0,
-        RiskLevel.HIGH: 1,
-        RiskLevel.MEDIUM: 2,
-        RiskLevel.LOW: 3,
-        RiskLevel.INFO: 4,
-    }
-
-    # Default to LOW if user didn't specify, to exclude INFO
-    default_min_risk = "low" if args.min_risk == "info" else args.min_risk
-    min_risk_level = RiskLevel(default_min_risk)
-    min_risk_value = risk_order[min_risk_level]
-
-    filtered_findings = [
-        f for f in findings.findings if risk_order[f.risk_level] <= min_risk_value
-    ]
-
-    false_positives_count = sum(
-        1 for f in findings.findings if f.risk_level == RiskLevel.INFO
-    )
+            yield f"{i}. {rec}"
+        yield ""
 
-    output.append("## Detailed Findings\n")
+    yield "## Detailed Findings\n"
 
     if len(filtered_findings) == 0:
-        output.append("No user input handlers found at the requested priority level.\n")
+        yield "No user input handlers found at the requested priority level.\n"
         if false_positives_count > 0:
-            output.append(
+            yield (
                 f"*Note: {false_positives_count} items were identified as false positives (config, tests, utilities). Use `--min-risk info` to see them.*\n"
             )
-        return "\n".join(output)
+        return
 
     for i, analysis in enumerate(filtered_findings, 1):
-        risk_emoji = {
-            RiskLevel.CRITICAL: "🔴",
-            RiskLevel.HIGH: "🟠",
-            RiskLevel.MEDIUM: "🟡",
-            RiskLevel.LOW: "🔵",
-            RiskLevel.INFO: "⚪",
-        }
-
-        output.append(
-            f"### {risk_emoji[analysis.risk_level]} [{i}] {analysis.function_name}\n"
+        yield (
+            f"### {_RISK_EMOJI[analysis.risk_level]} [{i}] {analysis.function_name}\n"
         )
-        output.append(f"**Risk Level**: {analysis.risk_level.value.upper()}  ")
-        output.append(
+        yield f"**Risk Level**: {analysis.risk_level.value.upper()}  "
+        yield (
             f"**Location**: `{analysis.location.file_path}:{analysis.location.line_number}`  "
         )
-        output.append(f"**Framework**: {analysis.framework} ({analysis.language})  ")
+        if analysis.aliases:
+            also_at = ", ".join(f"`{a.file_path}:{a.line_number}`" for a in analysis.aliases)
+            yield f"**Also at**: {also_at}  "
+        yield f"**Framework**: {analysis.framework} ({analysis.language})  "
 
         if analysis.endpoint_path:
-            output.append(f"**Endpoint**: `{analysis.endpoint_path}`  ")
+            yield f"**Endpoint**: `{analysis.endpoint_path}`  "
 
         if analysis.http_methods:
-            output.append(f"**Methods**: {', '.join(analysis.http_methods)}  ")
+            yield f"**Methods**: {', '.join(analysis.http_methods)}  "
 
-        output.append(
+        yield (
             f"**Unauthenticated**: {'YES ⚠️' if analysis.accepts_unauthenticated_input else 'NO ✓'}  "
         )
 
         if analysis.input_sources:
             sources = ", ".join(f"`{s.value}`" for s in analysis.input_sources)
-            output.append(f"**Input Sources**: {sources}  ")
+            yield f"**Input Sources**: {sources}  "
 
         # Display deployment context if available
         if analysis.deployment_context:
-            output.append("")
-            output.append("**Deployment Context**:  ")
+            yield ""
+            yield "**Deployment Context**:  "
             ctx = analysis.deployment_context
             if ctx.service_name:
-                output.append(f"- Service: `{ctx.service_name}`")
+                yield f"- Service: `{ctx.service_name}`"
             if ctx.trust_zone:
-                output.append(f"- Trust Zone: {ctx.trust_zone}")
+                yield f"- Trust Zone: {ctx.trust_zone}"
             if ctx.network_exposure:
-                output.append(f"- Network Exposure: {ctx.network_exposure}")
+                yield f"- Network Exposure: {ctx.network_exposure}"
             if ctx.deployment_target:
-                output.append(f"- Deployment Target: {ctx.deployment_target}")
+                yield f"- Deployment Target: {ctx.deployment_target}"
             if ctx.authentication_method:
-                output.append(f"- Auth Method: {ctx.authentication_method}")
+                yield f"- Auth Method: {ctx.authentication_method}"
             if ctx.upstream_services:
-                output.append(f"- Upstream Services: {', '.join(f'`{s}`' for s in ctx.upstream_services)}")
+                yield f"- Upstream Services: {', '.join(f'`{s}`' for s in ctx.upstream_services)}"
             if ctx.downstream_services:
-                output.append(f"- Downstream Services: {', '.join(f'`{s}`' for s in ctx.downstream_services)}")
+                yield f"- Downstream Services: {', '.join(f'`{s}`' for s in ctx.downstream_services)}"
 
-        output.append("")
+        yield ""
 
         if analysis.security_concerns:
-            output.append("**Security Concerns**:\n")
+            yield "**Security Concerns**:\n"
             for concern in analysis.security_concerns:
                 conf_pct = int(concern.confidence * 100)
-                output.append(
+                yield (
                     f"- **{concern.vulnerability_type.value}**: {concern.description} ({conf_pct}% confidence)"
                 )
-            output.append("")
+            yield ""
 
-        output.append("**Security Controls**:\n")
-        output.append(
+        yield "**Security Controls**:\n"
+        yield (
             f"- Input Validation: {'✓ Present' if analysis.has_input_validation else '✗ Missing' if analysis.has_input_validation is False else '? Unknown'}"
         )
-        output.append(
+        yield (
             f"- Sanitization: {'✓ Present' if analysis.has_sanitization else '✗ Missing' if analysis.has_sanitization is False else '? Unknown'}"
         )
-        output.append(
+        yield (
             f"- Authorization: {'✓ Present' if analysis.has_authorization_check else '✗ Missing' if analysis.has_authorization_check is False else '? Unknown'}"
         )
-        output.append("")
-
-        output.append(f"**Analysis**: {analysis.reasoning}\n")
-        output.append("---\n")
+        yield ""
 
-    return "\n".join(output)
+        yield f"**Analysis**: {analysis.reasoning}\n"
+        yield "---\n"
 
 
 async def main():
     """Main entry point."""
     args = parse_args()
+    if args.target is None:
+        args.target = Path.cwd()
 
     # Determine rules directory
     if args.rules:
@@ -469,21 +506,47 @@ async def main():
         print(f"Error: Target directory not found: {args.target}", file=sys.stderr)
         sys.exit(1)
 
-    print("=" * 80)
+    if args.batch and (args.format != "jsonl" or not args.model.startswith("openai:")):
+        print("Error: --batch requires --format jsonl and an openai: model", file=sys.stderr)
+        sys.exit(1)
+
+    print(_EQ80)
     print("Security Analysis Tool - User Input Handlers")
-    print("=" * 80)
+    print(_EQ80)
     print(f"Target: {args.target}")
     print(f"Rules: {rules_dir}")
     print(f"Model: {args.model}")
     print(f"Context: {args.context_lines} lines")
     print("")
 
+    # Parse the deployment model in a worker thread while ast-grep scans;
+    # the two are independent, so Step 2 only waits for whichever is slower
+    deployment_task = None
+    if args.deployment_model:
+        try:
+            from deployment_parser import DeploymentModelParser
+        except ImportError:
+            DeploymentModelParser = None
+
+        if not DeploymentModelParser:
+            print("Warning: deployment_parser module not available, skipping deployment context enrichment")
+        elif not args.deployment_model.exists():
+            print(f"Warning: Deployment model file not found: {args.deployment_model}")
+        else:
+            deployment_task = asyncio.create_task(asyncio.to_thread(
+                DeploymentModelParser,
+                args.deployment_model,
+                debug=args.debug_deployment
+            ))
+
     # Step 1: Scan with ast-grep
     print("STEP 1: Scanning codebase with ast-grep")
-    print("-" * 80)
+    print(_DASH80)
+
+    from scanner import AstGrepScanner
 
     scanner = AstGrepScanner(rules_dir=rules_dir, target_dir=args.target)
-    findings = scanner.scan_all()
+    findings = await asyncio.to_thread(scanner.scan_all)
 
     if not findings:
         print("No findings detected. Exiting.")
@@ -510,6 +573,20 @@ async def main():
 
     findings = unique_findings
 
+    # With a real-handler quota, triage the most handler-like findings first
+    # so the quota is reached sooner. Scores come from the matched snippet,
+    # which is already in memory, so no files are read here.
+    if args.max_real_handlers:
+        from prefilter import keyword_score
+
+        def _priority_key(finding):
+            return (
+                -keyword_score(finding.code_snippet.encode(), finding.language),
+                finding.file_path,
+            )
+
+        findings.sort(key=_priority_key)
+
     # Limit findings if requested
     if args.max_findings and len(findings) > args.max_findings:
         print(
@@ -519,84 +596,102 @@ async def main():
 
     # Step 2: Triage with AI
     print("STEP 2: Triaging findings with AI")
-    print("-" * 80)
+    print(_DASH80)
 
-    # Parse deployment model if provided
+    # Deployment model parsed in the background during the scan
     deployment_parser = None
-    if args.deployment_model:
-        if not DeploymentModelParser:
-            print("Warning: deployment_parser module not available, skipping deployment context enrichment")
-        elif not args.deployment_model.exists():
-            print(f"Warning: Deployment model file not found: {args.deployment_model}")
-        else:
-            print(f"Loading deployment model from: {args.deployment_model}")
-            deployment_parser = DeploymentModelParser(
-                args.deployment_model,
-                debug=args.debug_deployment
-            )
-            print(f"  Found {len(deployment_parser.services)} services")
-            print(f"  Found {len(deployment_parser.trust_zones)} trust zones")
-            if args.debug_deployment:
-                print("\n  Service repository paths:")
-                for svc_name, svc_info in deployment_parser.services.items():
-                    paths = svc_info.get('repository_paths', [])
-                    if paths:
-                        print(f"    {svc_name}: {paths}")
-            print("")
-
-    agent = SecurityTriageAgent(model=args.model, deployment_parser=deployment_parser)
+    if deployment_task is not None:
+        print(f"Loading deployment model from: {args.deployment_model}")
+        deployment_parser = await deployment_task
+        print(f"  Found {len(deployment_parser.services)} services")
+        print(f"  Found {len(deployment_parser.trust_zones)} trust zones")
+        if args.debug_deployment:
+            print("\n  Service repository paths:")
+            for svc_name, svc_info in deployment_parser.services.items():
+                paths = svc_info.get('repository_paths', [])
+                if paths:
+                    print(f"    {svc_name}: {paths}")
+        print("")
+
+    from agent import SecurityTriageAgent
+    from triage_cache import TriageCache
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = TriageCache()
+        except Exception as e:
+            print(f"Warning: Could not open triage cache, continuing without it: {e}")
+
+    agent = await SecurityTriageAgent.create(
+        model=args.model,
+        deployment_parser=deployment_parser,
+        cache=cache,
+        concurrency=args.concurrency,
+        collapse_duplicates=args.collapse_duplicates,
+        cascade=args.cascade,
+    )
 
     # Create code reader function
     def code_reader(file_path: str, line_num: int) -> Optional[str]:
         return scanner.read_code_context(file_path, line_num, args.context_lines)
 
-    # Handle JSONL streaming format differently
-    if args.format == "jsonl":
-        # For JSONL, we stream results as they're completed
-        if not args.output:
-            print("Error: JSONL format requires --output to be specified", file=sys.stderr)
-            sys.exit(1)
+    try:
+        # Handle JSONL streaming format differently
+        if args.format == "jsonl":
+            # For JSONL, we stream results as they're completed
+            if not args.output:
+                print("Error: JSONL format requires --output to be specified", file=sys.stderr)
+                sys.exit(1)
+
+            if args.batch:
+                results = agent.triage_all_findings_batch(findings, code_reader)
+            else:
+                results = agent.triage_all_findings_streaming(
+                    findings, code_reader, max_real_handlers=args.max_real_handlers
+                )
 
-        # Open file for writing and stream results
-        with open(args.output, 'w') as f:
-            async for analysis in agent.triage_all_findings_streaming(
-                findings, code_reader, max_real_handlers=args.max_real_handlers
-            ):
-                # Write each analysis as a JSON line
-                json_line = analysis.model_dump_json()
-                f.write(json_line + '\n')
-                f.flush()  # Ensure immediate write for streaming
-
-        print(f"\nResults streamed to: {args.output}")
-        print("(Each line is a separate JSON object - JSONL format)")
-    else:
-        # For other formats, use the original batch processing
-        prioritized_findings = await agent.triage_all_findings(
-            findings, code_reader, max_real_handlers=args.max_real_handlers
-        )
+            # Open file for writing and stream results
+            # Unbuffered, so each line reaches the file as one write
+            with open(args.output, 'wb', buffering=0) as f:
+                async for analysis in results:
+                    # Write each analysis as a JSON line
+                    f.write(dump_json(analysis) + b'\n')
 
-        # Step 3: Output results
-        print("\n" + "=" * 80)
-        print("STEP 3: Generating Report")
-        print("=" * 80 + "\n")
-
-        if args.format == "json":
-            output_text = prioritized_findings.model_dump_json(indent=2)
-        elif args.format == "markdown":
-            output_text = format_output_markdown(prioritized_findings, args)
-        else:  # text
-            output_text = format_output_text(prioritized_findings, args)
-
-        # Write to file or stdout
-        if args.output:
-            args.output.write_text(output_text)
-            print(f"Results written to: {args.output}")
+            print(f"\nResults streamed to: {args.output}")
+            print("(Each line is a separate JSON object - JSONL format)")
         else:
-            print(output_text)
+            # For other formats, use the original batch processing
+            prioritized_findings = await agent.triage_all_findings(
+                findings, code_reader, max_real_handlers=args.max_real_handlers
+            )
 
-    print("\n" + "=" * 80)
+            # Step 3: Output results
+            print(f"\n{_EQ80}")
+            print("STEP 3: Generating Report")
+            print(f"{_EQ80}\n")
+
+            if args.format == "json":
+                output_lines = [dump_json(prioritized_findings, indent=True).decode()]
+            elif args.format == "markdown":
+                output_lines = iter_output_markdown(prioritized_findings, args)
+            else:  # text
+                output_lines = iter_output_text(prioritized_findings, args)
+
+            # Stream to file or stdout instead of building the whole report in memory
+            if args.output:
+                with args.output.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+                    fh.writelines(f"{line}\n" for line in output_lines)
+                print(f"Results written to: {args.output}")
+            else:
+                sys.stdout.writelines(f"{line}\n" for line in output_lines)
+
+    finally:
+        await agent.aclose()
+
+    print(f"\n{_EQ80}")
     print("Analysis Complete")
-    print("=" * 80)
+    print(_EQ80)
 
 
 if __name__ == "__main__":
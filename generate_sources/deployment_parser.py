@@ -1,10 +1,16 @@
 """Parser for deployment model JSON files."""
 
+import functools
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from models import DeploymentContext
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class DeploymentModelParser:
     """Parses deployment model JSON and provides deployment context."""
@@ -22,7 +28,20 @@ class DeploymentModelParser:
         self.services = {}
         self.trust_zones = []
         self.debug = debug
+        # Services by integer ID (their order in the model), with the
+        # deployment context of each built once
+        self.service_names: List[str] = []
+        self._contexts: List[DeploymentContext] = []
+        # Component trie of repository paths; a node's None key holds
+        # (match length, service ID) for paths ending there
+        self._path_trie: Dict = {}
         self._load()
+        self._build_service_table()
+        self._build_path_trie()
+        # Many findings share a file and the model doesn't change after
+        # loading, so lookups are memoized per path. The cache lives on the
+        # instance rather than on the method, so it's dropped with the parser.
+        self._service_id_for_path = functools.lru_cache(maxsize=4096)(self._match_service_id)
 
     def _load(self):
         """Load and parse the JSON file."""
@@ -31,8 +50,10 @@ class DeploymentModelParser:
             return
 
         try:
-            with open(self.json_path, 'r') as f:
-                self.model = json.load(f)
+            with open(self.json_path, 'rb') as f:
+                data = f.read()
+            # orjson's decode error subclasses json.JSONDecodeError
+            self.model = orjson.loads(data) if orjson is not None else json.loads(data)
 
             self.services = self.model.get('services', {})
             self.trust_zones = self.model.get('trust_zones', [])
@@ -43,64 +64,106 @@ class DeploymentModelParser:
         except Exception as e:
             print(f"Error loading deployment model: {e}")
 
-    def get_deployment_context(self, file_path: str) -> Optional[DeploymentContext]:
+    def _build_service_table(self):
+        """Resolve each service's trust zone and auth method once, by service ID."""
+        self.service_names = list(self.services)
+        name_to_id = {name: i for i, name in enumerate(self.service_names)}
+
+        # Trust zone for each service: the first zone that lists it
+        trust_zones: Dict[int, Optional[str]] = {}
+        for zone in self.trust_zones:
+            for name in zone.get('services', []):
+                if name in name_to_id:
+                    trust_zones.setdefault(name_to_id[name], zone.get('name'))
+
+        # Authentication method: the first service-to-service comm where this
+        # is the "from" service, falling back to the user auth method
+        auth_methods: Dict[int, Optional[str]] = {}
+        for comm in self.model.get('communications', []):
+            if comm.get('from_service') in name_to_id:
+                auth_methods.setdefault(name_to_id[comm['from_service']], comm.get('auth_method'))
+        user_auth_method = self.model.get('user_authentication_method')
+
+        self._contexts = [
+            DeploymentContext(
+                service_name=service_info.get('name', service_name),
+                trust_zone=trust_zones.get(service_id),
+                network_exposure=service_info.get('network_exposure', 'Internal only'),
+                authentication_method=auth_methods.get(service_id) or user_auth_method,
+                deployment_target=service_info.get('deployment_target'),
+                upstream_services=service_info.get('upstream_services', []),
+                downstream_services=service_info.get('downstream_services', [])
+            )
+            for service_id, (service_name, service_info) in enumerate(self.services.items())
+        ]
+
+    def _build_path_trie(self):
+        """Index every service's repository_paths by path component."""
+        for service_id, service_info in enumerate(self.services.values()):
+            for repo_path in service_info.get('repository_paths', []):
+                normalized_repo_path = repo_path.replace('\\', '/').lower().strip('/')
+                if not normalized_repo_path:
+                    continue
+
+                node = self._path_trie
+                for part in normalized_repo_path.split('/'):
+                    node = node.setdefault(part, {})
+                # Keep the first service that lists this exact path
+                node.setdefault(None, (len(normalized_repo_path), service_id))
+
+    def service_for_path(self, file_path: str) -> Optional[str]:
         """
-        Get deployment context for a given file path.
+        Find the service whose repository path best matches a file path.
+
+        A repository path matches when it appears as whole path components
+        anywhere in the file path and is followed by more components, or is a
+        single component equal to one of the file path's components. The
+        longest matching repository path wins, then the earliest service.
 
         Args:
             file_path: Path to the source file
 
         Returns:
-            DeploymentContext if service is found, None otherwise
+            Service name, or None if no repository path matches
         """
-        if not self.services:
-            return None
+        service_id = self._service_id_for_path(file_path)
+        return self.service_names[service_id] if service_id is not None else None
 
+    def _match_service_id(self, file_path: str) -> Optional[int]:
+        """Trie lookup behind service_for_path(), returning the service ID."""
         # Normalize the file path - handle both absolute and relative paths
-        normalized_path = file_path.replace('\\', '/').lower()
+        path_parts = file_path.replace('\\', '/').lower().split('/')
+
+        best = None
+        for start in range(len(path_parts)):
+            node = self._path_trie
+            for depth, part in enumerate(path_parts[start:], 1):
+                node = node.get(part)
+                if node is None:
+                    break
+                entry = node.get(None)
+                if entry and (start + depth < len(path_parts) or depth == 1):
+                    if best is None or (entry[0], -entry[1]) > (best[0], -best[1]):
+                        best = entry
+
+        return best[1] if best else None
 
-        # Try to extract just the relative path part
-        # Common patterns: /full/path/to/repo/app/file.py -> app/file.py
-        path_parts = normalized_path.split('/')
+    def get_deployment_context(self, file_path: str) -> Optional[DeploymentContext]:
+        """
+        Get deployment context for a given file path.
 
-        # Find matching service by checking repository_paths
-        matched_service = None
-        matched_service_name = None
-        best_match_length = 0
+        Args:
+            file_path: Path to the source file
 
-        for service_name, service_info in self.services.items():
-            repo_paths = service_info.get('repository_paths', [])
+        Returns:
+            DeploymentContext if service is found, None otherwise
+        """
+        if not self.services:
+            return None
 
-            # Check if file path contains or starts with any of the repository paths
-            for repo_path in repo_paths:
-                normalized_repo_path = repo_path.replace('\\', '/').lower().strip('/')
+        service_id = self._service_id_for_path(file_path)
 
-                # Try multiple matching strategies:
-                # 1. Exact prefix match
-                if normalized_path.startswith(normalized_repo_path + '/'):
-                    match_length = len(normalized_repo_path)
-                    if match_length > best_match_length:
-                        matched_service = service_info
-                        matched_service_name = service_name
-                        best_match_length = match_length
-
-                # 2. Path contains the repo path (for absolute paths)
-                elif ('/' + normalized_repo_path + '/') in normalized_path:
-                    match_length = len(normalized_repo_path)
-                    if match_length > best_match_length:
-                        matched_service = service_info
-                        matched_service_name = service_name
-                        best_match_length = match_length
-
-                # 3. Check if any path component matches
-                elif normalized_repo_path in path_parts:
-                    match_length = len(normalized_repo_path)
-                    if match_length > best_match_length:
-                        matched_service = service_info
-                        matched_service_name = service_name
-                        best_match_length = match_length
-
-        if not matched_service:
+        if service_id is None:
             if self.debug:
                 print(f"  ⚠ No service match for: {file_path}")
                 print(f"    Available services: {list(self.services.keys())}")
@@ -112,34 +175,6 @@ class DeploymentModelParser:
             return None
 
         if self.debug:
-            print(f"  ✓ Matched {file_path} -> {matched_service_name}")
+            print(f"  ✓ Matched {file_path} -> {self.service_names[service_id]}")
 
-        # Determine trust zone for this service
-        trust_zone = None
-        for zone in self.trust_zones:
-            if matched_service_name in zone.get('services', []):
-                trust_zone = zone.get('name')
-                break
-
-        # Get authentication method
-        # First check service-to-service comms where this is the "from" service
-        auth_method = None
-        communications = self.model.get('communications', [])
-        for comm in communications:
-            if comm.get('from_service') == matched_service_name:
-                auth_method = comm.get('auth_method')
-                break
-
-        # Fall back to user auth method if no service auth found
-        if not auth_method:
-            auth_method = self.model.get('user_authentication_method')
-
-        return DeploymentContext(
-            service_name=matched_service.get('name', matched_service_name),
-            trust_zone=trust_zone,
-            network_exposure=matched_service.get('network_exposure', 'Internal only'),
-            authentication_method=auth_method,
-            deployment_target=matched_service.get('deployment_target'),
-            upstream_services=matched_service.get('upstream_services', []),
-            downstream_services=matched_service.get('downstream_services', [])
-        )
+        return self._contexts[service_id]
@@ -4,8 +4,9 @@
 import asyncio
 from pathlib import Path
 
+from analyze import dump_json
 from scanner import AstGrepScanner
-from agent import SecurityAnalysisAgent
+from agent import SecurityTriageAgent
 from models import RiskLevel
 
 
@@ -38,7 +39,9 @@ async def main():
     # - "anthropic:claude-3-5-sonnet-20241022" (requires ANTHROPIC_API_KEY)
     # - "openai:gpt-4o-mini" (cheaper, faster)
 
-    agent = SecurityAnalysisAgent(model="openai:gpt-5")
+    # Findings are triaged concurrently; concurrency bounds how many LLM
+    # calls are in flight at once (lower it if you hit provider rate limits)
+    agent = await SecurityTriageAgent.create(model="openai:gpt-5", concurrency=20)
 
     # Step 3: Analyze findings
     print("Step 3: Analyzing with AI...\n")
@@ -48,7 +51,10 @@ async def main():
         return scanner.read_code_context(file_path, line_num, context_lines=30)
 
     # Run analysis
-    results = await agent.analyze_all_findings(findings, code_reader)
+    try:
+        results = await agent.triage_all_findings(findings, code_reader)
+    finally:
+        await agent.aclose()
 
     # Step 4: Display results
     print("\n" + "=" * 80)
@@ -85,7 +91,7 @@ async def main():
 
     # Step 5: Export to JSON (optional)
     output_path = Path("security-analysis-results.json")
-    output_path.write_text(results.model_dump_json(indent=2))
+    output_path.write_bytes(dump_json(results, indent=True))
     print(f"\nFull results saved to: {output_path}")
 
 
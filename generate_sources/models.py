@@ -1,8 +1,9 @@
 """Pydantic models for security analysis output."""
 
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.json_schema import SkipJsonSchema
 
 
 class RiskLevel(str, Enum):
@@ -13,6 +14,15 @@ class RiskLevel(str, Enum):
     LOW = "low"
     INFO = "info"
 
+    @property
+    def rank(self) -> int:
+        """Sort position, 0 for CRITICAL through 4 for INFO."""
+        return RISK_RANK[self]
+
+
+# Precomputed so sorting and counting by risk avoid rebuilding the ordering
+RISK_RANK = {level: rank for rank, level in enumerate(RiskLevel)}
+
 
 class InputSource(str, Enum):
     """Types of user input sources."""
@@ -48,6 +58,8 @@ class VulnerabilityType(str, Enum):
 
 class SecurityConcern(BaseModel):
     """A specific security concern identified in the code."""
+    model_config = ConfigDict(frozen=True)
+
     vulnerability_type: VulnerabilityType
     description: str = Field(..., description="Explanation of the security concern")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score (0-1)")
@@ -55,6 +67,8 @@ class SecurityConcern(BaseModel):
 
 class CodeLocation(BaseModel):
     """Location of code in the repository."""
+    model_config = ConfigDict(frozen=True)
+
     file_path: str
     line_number: int
     column: Optional[int] = None
@@ -63,6 +77,9 @@ class CodeLocation(BaseModel):
 
 class DeploymentContext(BaseModel):
     """Deployment and infrastructure context for a function."""
+    # One instance is shared by every finding in the service
+    model_config = ConfigDict(frozen=True)
+
     service_name: Optional[str] = Field(
         None,
         description="Name of the service/component this function belongs to"
@@ -95,8 +112,15 @@ class DeploymentContext(BaseModel):
 
 class FunctionAnalysis(BaseModel):
     """Analysis of a single function handling user input."""
+    is_real_handler: bool = Field(
+        ...,
+        description="Whether this is a real user input handler that processes runtime requests"
+    )
     function_name: str
     location: CodeLocation
+    # Other locations with identical code, filled in when duplicates are
+    # collapsed; hidden from the schema the model fills in
+    aliases: SkipJsonSchema[List[CodeLocation]] = Field(default_factory=list)
     framework: str = Field(..., description="Web framework or library (e.g., Express, FastAPI, Spring)")
     language: str = Field(..., description="Programming language (e.g., javascript, python, java)")
 
@@ -177,8 +201,23 @@ class PrioritizedFindings(BaseModel):
     )
 
 
+class TriageSummary(BaseModel):
+    """Narrative part of the triage report, written by the summary agent."""
+    summary: str = Field(
+        ...,
+        description="Executive summary of the analysis"
+    )
+
+    recommendations: List[str] = Field(
+        default_factory=list,
+        description="General security recommendations"
+    )
+
+
 class AstGrepFinding(BaseModel):
     """Parsed ast-grep scan finding."""
+    model_config = ConfigDict(frozen=True)
+
     file_path: str
     line_number: int
     column: int
@@ -187,3 +226,21 @@ class AstGrepFinding(BaseModel):
     code_snippet: str
     framework: str
     language: str
+
+
+class FastFilterVerdict(BaseModel):
+    """Fast filter verdict for a single finding."""
+    verdict: Literal["REAL", "FALSE_POSITIVE"]
+
+
+class FastFilterBatchItem(FastFilterVerdict):
+    """Fast filter verdict for one numbered finding in a batch."""
+    index: int = Field(..., description="1-based number of the finding in the batch")
+
+
+class FastFilterBatch(BaseModel):
+    """Fast filter verdicts for a batch of findings."""
+    verdicts: List[FastFilterBatchItem] = Field(
+        default_factory=list,
+        description="One verdict per numbered finding"
+    )
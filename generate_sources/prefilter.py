@@ -0,0 +1,117 @@
+"""Cheap keyword prefilter for ast-grep findings, run before any LLM call."""
+
+import re
+from typing import Dict, List
+
+
+# Patterns that show up in (nearly) every real request handler for a
+# language: request objects, parameter access and route registration. Word
+# boundaries keep short tokens like "req" from matching "require" or
+# "requests"; matched case-insensitively against the code context, with "^"
+# anchored at line starts.
+KEYWORDS_BY_LANG: Dict[str, List[bytes]] = {
+    "python": [
+        rb"\brequest\b",
+        rb"@\w+\.(?:get|post|put|patch|delete|head|options|route|api_route|websocket)\(",
+        rb"\b(?:re_)?path\(",
+        rb"\b(?:query|body|form|header|cookie|file)\(",
+        rb"servicer\b",
+        rb"\bcontext\.(?:abort|invocation_metadata|peer|set_code)\b",
+    ],
+    "javascript": [
+        rb"\breq\b",
+        rb"\brequest\b",
+        rb"\bctx\.(?:request|req|params|query|body)\b",
+        rb"\b(?:app|router|server|route|fastify)\.(?:get|post|put|patch|delete|all|use|route)\(",
+        rb"@(?:get|post|put|patch|delete|controller)\(",
+        rb"\bexport\s+(?:async\s+)?function\s+(?:get|post|put|patch|delete|loader|action)\b",
+        rb"\bnext(?:api)?request\b",
+        rb"\bresolvers?",
+        rb"\bprocedure\b",
+        rb"\.(?:input|mutation)\(",
+        rb"\bevent\.(?:body|querystringparameters|pathparameters|headers)\b",
+    ],
+    "go": [
+        rb"\bhttp\.request\b",
+        rb"\bhttp\.responsewriter\b",
+        rb"\b(?:gin|echo|fiber)\.(?:context|ctx)\b",
+        rb"\.(?:param|query|postform|formvalue|bind\w*|shouldbind\w*)\(",
+        rb"\bhandle(?:func)?\(",
+        rb"\*\w+\.\w*request\b",
+        rb"\bgrpc\.",
+    ],
+    "java": [
+        rb"@\w*mapping\b",
+        rb"@(?:path|get|post|put|patch|delete)\b",
+        rb"@(?:requestparam|requestbody|pathvariable|requestheader|queryparam|pathparam|formparam)\b",
+        rb"\bhttpservletrequest\b",
+        rb"\bstreamobserver\b",
+        rb"@(?:rest)?controller\b",
+        rb"\bdo(?:get|post|put|delete)\(",
+    ],
+    "ruby": [
+        rb"\bparams\b",
+        rb"\brequest\.",
+        rb"^\s*(?:get|post|put|patch|delete|match|root)\b",
+        rb"^\s*(?:resources?|namespace|scope)\b",
+        rb"\w*controller\b",
+    ],
+    "rust": [
+        rb"#\[(?:get|post|put|delete|patch|route)\b",
+        rb"\b(?:json|query|path|form)<",
+        rb"\bhttprequest\b",
+        rb"\brequest<",
+        rb"\btonic::",
+        rb"\.route\(",
+    ],
+    "cpp": [
+        rb"\breq\b",
+        rb"\b(?:http)?request(?:ptr)?\b",
+        rb"\bservercontext\b",
+        rb"\bgrpc::",
+        rb"\bcrow_route\b",
+        rb"\bmethod_(?:add|list)\b",
+        rb"\bendpoint(?:_async)?\(",
+    ],
+}
+
+# One compiled alternation per language, so the scan is a single pass over the bytes
+_KEYWORD_RE_BY_LANG = {
+    lang: re.compile(b"|".join(keywords), re.IGNORECASE | re.MULTILINE)
+    for lang, keywords in KEYWORDS_BY_LANG.items()
+}
+
+
+def is_plausible_handler(code: bytes, lang: str) -> bool:
+    """
+    Check whether code could be a request handler, by pattern presence alone.
+
+    Args:
+        code: Code context around the finding
+        lang: Language of the rule that matched (e.g., "python")
+
+    Returns:
+        False only if none of the language's patterns match; True for
+        languages without a keyword set
+    """
+    keyword_re = _KEYWORD_RE_BY_LANG.get(lang)
+    if keyword_re is None:
+        return True
+    return keyword_re.search(code) is not None
+
+
+def keyword_score(code: bytes, lang: str) -> int:
+    """
+    Count pattern hits in code, as a rough measure of how handler-like it is.
+
+    Args:
+        code: Code context around the finding
+        lang: Language of the rule that matched (e.g., "python")
+
+    Returns:
+        Number of pattern matches; 0 for languages without a keyword set
+    """
+    keyword_re = _KEYWORD_RE_BY_LANG.get(lang)
+    if keyword_re is None:
+        return 0
+    return sum(1 for _ in keyword_re.finditer(code))
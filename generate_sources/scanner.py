@@ -1,17 +1,100 @@
 """AST-grep scanner and result parser."""
 
+import functools
+import itertools
 import json
+import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import re
 
 from models import AstGrepFinding
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Decoder for ast-grep's JSON lines, orjson when it's installed
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# In-process matching through the ast-grep Python binding, when it (and a
+# YAML parser for the rule files) is installed; otherwise the ast-grep CLI
+try:
+    from ast_grep_py import SgRoot
+    import yaml
+except ImportError:
+    SgRoot = None
+
+# file:line:col at the start of a line of ast-grep's text output
+_LOCATION_RE = re.compile(r'^(.+?):(\d+):(\d+)')
+
+# Files larger than this are read just around each finding rather than
+# cached whole
+MAX_CACHED_FILE_BYTES = 1 << 20
+
+# File extensions each rule language applies to, as in the ast-grep CLI
+EXTENSIONS_BY_LANG: Dict[str, tuple] = {
+    "python": (".py", ".py3", ".pyi"),
+    "javascript": (".js", ".mjs", ".cjs", ".jsx"),
+    "typescript": (".ts", ".mts", ".cts"),
+    "go": (".go",),
+    "java": (".java",),
+    "ruby": (".rb", ".rbw", ".gemspec"),
+    "rust": (".rs",),
+    "cpp": (".cc", ".hpp", ".cpp", ".c++", ".hh", ".cxx", ".cu", ".ino"),
+}
+
 
 class AstGrepScanner:
     """Runs ast-grep scans and parses results."""
 
+    # Path fragments of generated/minified files
+    SKIP_PATTERNS = (
+        '/generated/',
+        '/dist/',
+        '/build/',
+        '/.next/',
+        '/out/',
+        '/__generated__/',
+        '/node_modules/',
+        '/vendor/',
+        '/.venv/',
+        '/venv/',
+        '/target/',
+        '.min.js',
+        '.min.css',
+        '-min.js',
+        '.bundle.js',
+        '.chunk.js',
+        'webpack.',
+        'rollup.',
+        'parcel.',
+        '.d.ts',  # TypeScript declaration files
+    )
+
+    # The same exclusions as ast-grep --globs, so skipped files are never
+    # parsed; _should_skip_file stays as the exact check on what's left
+    SKIP_GLOBS = tuple(
+        f"!**/{p.strip('/')}/**" if p.startswith('/') else
+        f"!**/{p}*" if p.endswith('.') else
+        f"!**/*{p}"
+        for p in SKIP_PATTERNS
+    )
+
+    # One pass over the lowercased path: any skip pattern, or "generated" /
+    # "codegen" in the file name
+    _SKIP_RE = re.compile(
+        '|'.join(map(re.escape, SKIP_PATTERNS)) + r'|(?:generated|codegen)[^/]*$'
+    )
+
+    # Directory names whose whole subtree SKIP_GLOBS excludes
+    SKIP_DIRS = frozenset(
+        p.strip('/') for p in SKIP_PATTERNS if p.startswith('/') and p.endswith('/')
+    )
+
     def __init__(self, rules_dir: Path, target_dir: Path):
         """
         Initialize the scanner.
@@ -22,7 +105,11 @@ class AstGrepScanner:
         """
         self.rules_dir = rules_dir
         self.target_dir = target_dir
-        self._verify_ast_grep_installed()
+        # (framework, language) per rule file, derived once per rule rather
+        # than once per finding
+        self._rule_meta: Dict[Path, tuple[str, str]] = {}
+        if SgRoot is None:
+            self._verify_ast_grep_installed()
 
     def _verify_ast_grep_installed(self) -> None:
         """Check if ast-grep is installed."""
@@ -59,10 +146,20 @@ class AstGrepScanner:
             "ast-grep",
             "scan",
             "-r", str(rule_file),
-            "--json",
+            "--json=stream",
+            *self._glob_args(),
             str(self.target_dir)
         ]
 
+        try:
+            return list(self._stream_json(cmd))
+        except ValueError:
+            # Not line-delimited JSON; re-run and parse the whole output below
+            cmd[cmd.index("--json=stream")] = "--json"
+        except Exception as e:
+            print(f"Error scanning with {rule_file.name}: {e}")
+            return []
+
         try:
             result = subprocess.run(
                 cmd,
@@ -75,9 +172,9 @@ class AstGrepScanner:
             if result.stdout:
                 try:
                     # Parse JSON output
-                    findings = json.loads(result.stdout)
+                    findings = _json_loads(result.stdout)
                     return findings if isinstance(findings, list) else []
-                except json.JSONDecodeError:
+                except ValueError:
                     # Fallback to text parsing if JSON fails
                     return self._parse_text_output(result.stdout, rule_file)
 
@@ -87,6 +184,208 @@ class AstGrepScanner:
             print(f"Error scanning with {rule_file.name}: {e}")
             return []
 
+    def scan_with_all_rules(self, rule_files: List[Path]) -> Optional[Dict[Path, List[Dict]]]:
+        """
+        Run every rule in a single ast-grep scan, walking the target once.
+
+        The rule files are passed together as inline rules, and each result
+        is attributed back to its rule file by rule ID.
+
+        Args:
+            rule_files: Rule YAML files to apply, one rule per file
+
+        Returns:
+            Findings as dictionaries, grouped by rule file; None if the
+            combined scan couldn't be run or parsed
+        """
+        rule_by_id = {}
+        rule_texts = []
+        for rule_file in rule_files:
+            text = rule_file.read_text()
+            match = re.search(r'^id:\s*(\S+)', text, re.MULTILINE)
+            if not match or match.group(1) in rule_by_id:
+                # Results couldn't be attributed unambiguously
+                return None
+            rule_by_id[match.group(1)] = rule_file
+            rule_texts.append(text.strip())
+
+        cmd = [
+            "ast-grep",
+            "scan",
+            "--inline-rules", "\n---\n".join(rule_texts),
+            "--json=stream",
+            *self._glob_args(),
+            str(self.target_dir)
+        ]
+
+        grouped: Dict[Path, List[Dict]] = {rule_file: [] for rule_file in rule_files}
+        try:
+            for raw_finding in self._stream_json(cmd, check_empty=True):
+                rule_file = rule_by_id.get(raw_finding.get('ruleId'))
+                if rule_file is not None:
+                    grouped[rule_file].append(raw_finding)
+        except Exception as e:
+            print(f"Combined scan failed, falling back to one scan per rule: {e}")
+            return None
+        return grouped
+
+    def scan_in_process(self, rule_files: List[Path]) -> Optional[Dict[Path, List[Dict]]]:
+        """
+        Match every rule with the ast-grep Python binding, without subprocesses.
+
+        Each source file is read and parsed once, and all rules for its
+        language run against the same syntax tree. Results use the same keys
+        as the CLI's JSON output, so parse_finding handles both.
+
+        Args:
+            rule_files: Rule YAML files to apply, one rule per file
+
+        Returns:
+            Findings as dictionaries, grouped by rule file; None if a rule
+            couldn't be loaded or run
+        """
+        rules_by_ext: Dict[str, List[tuple]] = {}
+        try:
+            for rule_file in rule_files:
+                rule = yaml.safe_load(rule_file.read_text())
+                config = {key: rule[key] for key in ("rule", "constraints", "utils") if key in rule}
+                entry = (rule_file, rule["id"], rule["language"], rule.get("message", ""), config)
+                for ext in EXTENSIONS_BY_LANG.get(rule["language"], ()):
+                    rules_by_ext.setdefault(ext, []).append(entry)
+        except Exception as e:
+            print(f"Could not load rules for in-process scan, using the ast-grep CLI: {e}")
+            return None
+
+        grouped: Dict[Path, List[Dict]] = {rule_file: [] for rule_file in rule_files}
+        for file_path in self._source_files():
+            rules = rules_by_ext.get(os.path.splitext(file_path)[1])
+            # Findings in skipped files would be dropped by scan_all anyway
+            if not rules or self._should_skip_file(file_path):
+                continue
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    source = f.read()
+            except OSError as e:
+                print(f"Error reading {file_path}: {e}")
+                continue
+
+            roots = {}
+            for rule_file, rule_id, language, message, config in rules:
+                if language not in roots:
+                    roots[language] = SgRoot(source, language).root()
+                try:
+                    matches = roots[language].find_all(config)
+                except Exception as e:
+                    print(f"Rule {rule_id} failed in-process, using the ast-grep CLI: {e}")
+                    return None
+                for node in matches:
+                    start = node.range().start
+                    grouped[rule_file].append({
+                        'file': file_path,
+                        'range': {'start': {'line': start.line, 'column': start.column}},
+                        'text': node.text(),
+                        'ruleId': rule_id,
+                        'message': message,
+                    })
+        return grouped
+
+    def _source_files(self) -> Iterator[str]:
+        """
+        List the files under the target that the ast-grep CLI would scan.
+
+        Like the CLI, this leaves out hidden files and directories, anything
+        the repository's ignore rules (.gitignore, .git/info/exclude, the
+        global excludes file) match, and the SKIP_GLOBS directories. Outside
+        a git work tree no ignore files apply, as with the CLI.
+
+        Yields:
+            File paths, joined onto target_dir as in the CLI's output
+        """
+        target = str(self.target_dir)
+        try:
+            listed = self._git_ls_files("--cached", "--others", "--exclude-standard")
+            # Tracked files that match an ignore rule are still ignored by the CLI
+            ignored = set(self._git_ls_files("--cached", "--ignored", "--exclude-standard"))
+        except (OSError, subprocess.CalledProcessError):
+            listed = None
+
+        if listed is not None:
+            for rel_path in listed:
+                parts = rel_path.split('/')
+                if (
+                    rel_path in ignored
+                    or any(part.startswith('.') or part in self.SKIP_DIRS for part in parts[:-1])
+                    or parts[-1].startswith('.')
+                ):
+                    continue
+                file_path = os.path.join(target, rel_path)
+                # Deleted-but-tracked files and submodule entries
+                if os.path.isfile(file_path):
+                    yield file_path
+            return
+
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames[:] = [
+                d for d in dirnames
+                if not d.startswith('.') and d not in self.SKIP_DIRS
+            ]
+            for filename in filenames:
+                if not filename.startswith('.'):
+                    yield os.path.join(dirpath, filename)
+
+    def _git_ls_files(self, *args: str) -> List[str]:
+        """Run git ls-files in the target directory; paths are relative to it."""
+        result = subprocess.run(
+            ["git", "ls-files", "-z", *args],
+            cwd=self.target_dir,
+            capture_output=True,
+            check=True,
+        )
+        return [p for p in result.stdout.decode('utf-8', errors='surrogateescape').split('\0') if p]
+
+    def _glob_args(self) -> List[str]:
+        """ast-grep arguments excluding the SKIP_GLOBS paths from a scan."""
+        return [arg for glob in self.SKIP_GLOBS for arg in ("--globs", glob)]
+
+    def _stream_json(self, cmd: List[str], check_empty: bool = False) -> Iterator[Dict]:
+        """
+        Run an ast-grep command and decode its --json=stream output line by line.
+
+        Findings are decoded as ast-grep writes them, so neither the whole
+        output nor a list of every finding has to be held at once.
+
+        Args:
+            cmd: ast-grep command line, using --json=stream
+            check_empty: Treat a failing exit status with no output as an error
+
+        Yields:
+            Each finding as a dictionary
+
+        Raises:
+            ValueError: A line of output wasn't a JSON object
+            RuntimeError: check_empty is set and ast-grep failed without output
+        """
+        with subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        ) as proc:
+            count = 0
+            try:
+                for line in proc.stdout:
+                    if not line.strip():
+                        continue
+                    raw_finding = _json_loads(line)
+                    if not isinstance(raw_finding, dict):
+                        raise ValueError("ast-grep output is not line-delimited JSON")
+                    count += 1
+                    yield raw_finding
+            except BaseException:
+                proc.kill()
+                raise
+
+        # ast-grep returns non-zero when findings are present
+        if check_empty and proc.returncode != 0 and count == 0:
+            raise RuntimeError(f"ast-grep exited with status {proc.returncode}")
+
     def _parse_text_output(self, output: str, rule_file: Path) -> List[Dict]:
         """
         Parse text output from ast-grep when JSON is not available.
@@ -106,7 +405,7 @@ class AstGrepScanner:
             line = lines[i].strip()
 
             # Look for file:line:col pattern
-            match = re.match(r'^(.+?):(\d+):(\d+)', line)
+            match = _LOCATION_RE.match(line)
             if match:
                 file_path = match.group(1)
                 line_num = int(match.group(2))
@@ -168,7 +467,10 @@ class AstGrepScanner:
         Returns:
             Parsed AstGrepFinding
         """
-        framework, language = self._extract_framework_and_language(rule_file)
+        meta = self._rule_meta.get(rule_file)
+        if meta is None:
+            meta = self._rule_meta[rule_file] = self._extract_framework_and_language(rule_file)
+        framework, language = meta
 
         # Handle both JSON and text parsed formats
         file_path = raw_finding.get('file', raw_finding.get('path', ''))
@@ -189,54 +491,21 @@ class AstGrepScanner:
             language=language
         )
 
-    def _should_skip_file(self, file_path: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _should_skip_file(file_path: str) -> bool:
         """
         Determine if a file should be skipped (generated, minified, etc.).
 
+        Cached per path, since a file usually yields several findings.
+
         Args:
             file_path: Path to check
 
         Returns:
             True if file should be skipped
         """
-        # Normalize path
-        path_lower = file_path.lower()
-
-        # Skip patterns for generated/minified files
-        skip_patterns = [
-            '/generated/',
-            '/dist/',
-            '/build/',
-            '/.next/',
-            '/out/',
-            '/__generated__/',
-            '/node_modules/',
-            '/vendor/',
-            '/.venv/',
-            '/venv/',
-            '/target/',
-            '.min.js',
-            '.min.css',
-            '-min.js',
-            '.bundle.js',
-            '.chunk.js',
-            'webpack.',
-            'rollup.',
-            'parcel.',
-            '.d.ts',  # TypeScript declaration files
-        ]
-
-        # Check if any skip pattern matches
-        for pattern in skip_patterns:
-            if pattern in path_lower:
-                return True
-
-        # Skip files with "generated" or "codegen" in the name
-        filename = Path(file_path).name.lower()
-        if 'generated' in filename or 'codegen' in filename:
-            return True
-
-        return False
+        return AstGrepScanner._SKIP_RE.search(file_path.lower()) is not None
 
     def scan_all(self) -> List[AstGrepFinding]:
         """
@@ -251,22 +520,30 @@ class AstGrepScanner:
 
         print(f"Found {len(rule_files)} rule files")
 
-        for rule_file in rule_files:
-            framework, language = self._extract_framework_and_language(rule_file)
-            print(f"Scanning with {language}/{framework}...")
+        # One pass over the target for all rules, in-process when the binding
+        # is available; per-rule CLI scans only if that fails
+        grouped = self.scan_in_process(rule_files) if SgRoot is not None else None
+        if grouped is None:
+            grouped = self.scan_with_all_rules(rule_files)
+        if grouped is None:
+            # Each scan is its own ast-grep process, so they run in parallel
+            # from threads; map() keeps the results in rule order
+            workers = min(os.cpu_count() or 1, 8, len(rule_files))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                grouped = dict(zip(rule_files, executor.map(self.scan_with_rule, rule_files)))
 
-            raw_findings = self.scan_with_rule(rule_file)
+        for rule_file in rule_files:
+            raw_findings = grouped[rule_file]
 
             for raw_finding in raw_findings:
                 try:
-                    finding = self.parse_finding(raw_finding, rule_file)
-
-                    # Skip generated/minified files
-                    if self._should_skip_file(finding.file_path):
+                    # Skip generated/minified files before building the model
+                    file_path = raw_finding.get('file', raw_finding.get('path', ''))
+                    if self._should_skip_file(file_path):
                         skipped_count += 1
                         continue
 
-                    all_findings.append(finding)
+                    all_findings.append(self.parse_finding(raw_finding, rule_file))
                 except Exception as e:
                     print(f"Error parsing finding from {rule_file.name}: {e}")
                     continue
@@ -296,15 +573,34 @@ class AstGrepScanner:
         try:
             full_path = self.target_dir / file_path if not Path(file_path).is_absolute() else Path(file_path)
 
-            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-
             start = max(0, line_number - context_lines - 1)
-            end = min(len(lines), line_number + context_lines)
+            end = line_number + context_lines
+
+            st = os.stat(full_path)
+            if st.st_size > MAX_CACHED_FILE_BYTES:
+                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    return ''.join(itertools.islice(f, start, end))
 
-            context = ''.join(lines[start:end])
-            return context
+            # Keyed on mtime/size so an edited file is re-read
+            lines = self._read_file_lines(str(full_path), st.st_mtime_ns, st.st_size)
+            return ''.join(lines[start:end])
 
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return None
+
+    @functools.lru_cache(maxsize=1024)
+    def _read_file_lines(self, path: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+        """
+        Read a file's lines once; later findings in the same file reuse them.
+
+        Args:
+            path: Absolute or target-relative path to the file
+            mtime_ns: Modification time, part of the cache key
+            size: File size in bytes, part of the cache key
+
+        Returns:
+            The file's lines, line endings included
+        """
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return tuple(f.readlines())
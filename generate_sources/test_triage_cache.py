@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test script for the on-disk triage cache."""
+
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from triage_cache import TriageCache
+
+
+def test_key_composition():
+    """Every part changes the key, and part boundaries can't be shifted."""
+    base = ("triage", "openai:gpt-5", "v3", "flask-routes", "Flask", "def f(): pass")
+    key = TriageCache.make_key(*base)
+    assert key == TriageCache.make_key(*base)
+    for i in range(len(base)):
+        changed = list(base)
+        changed[i] += "x"
+        assert TriageCache.make_key(*changed) != key, f"part {i} not in key"
+    assert TriageCache.make_key("a|b", "c") != TriageCache.make_key("a", "b|c")
+
+
+def test_round_trip_is_compressed():
+    """Values come back as written and are stored zlib-compressed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TriageCache(cache_dir=Path(tmp))
+        value = '{"is_real_handler": true, "risk_level": "high"}'
+        cache.put("k", value)
+        assert cache.get("k") == value
+        (stored,) = cache._conn.execute("SELECT value FROM entries WHERE key = 'k'").fetchone()
+        assert zlib.decompress(stored).decode("utf-8") == value
+
+        # Entries written before compression was added are plain text
+        cache._conn.execute(
+            "INSERT INTO entries (key, value, created_at) VALUES ('old', 'REAL', ?)",
+            (time.time(),),
+        )
+        assert cache.get("old") == "REAL"
+        assert cache.get("missing") is None
+        cache.close()
+
+
+def test_ttl():
+    """Expired entries read as missing and are deleted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TriageCache(cache_dir=Path(tmp), ttl_seconds=60)
+        cache.put("k", "REAL")
+        cache._conn.execute("UPDATE entries SET created_at = ?", (time.time() - 61,))
+        assert cache.get("k") is None
+        assert cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone() == (0,)
+        cache.close()
+
+
+def test_eviction_on_open():
+    """Opening drops expired entries, then the oldest beyond max_entries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        now = time.time()
+        cache = TriageCache(cache_dir=Path(tmp), ttl_seconds=60)
+        for key, age in (("expired", 120), ("oldest", 30), ("older", 20), ("newest", 10)):
+            cache.put(key, key)
+            cache._conn.execute(
+                "UPDATE entries SET created_at = ? WHERE key = ?", (now - age, key)
+            )
+        cache._conn.commit()
+        cache.close()
+
+        cache = TriageCache(cache_dir=Path(tmp), ttl_seconds=60, max_entries=2)
+        keys = {row[0] for row in cache._conn.execute("SELECT key FROM entries")}
+        assert keys == {"older", "newest"}, keys
+        cache.close()
+
+
+def main():
+    tests = [test_key_composition, test_round_trip_is_compressed, test_ttl, test_eviction_on_open]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
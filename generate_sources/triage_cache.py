@@ -0,0 +1,108 @@
+"""Persistent on-disk cache for LLM triage results."""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = Path("~/.securityreview_cache")
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+DEFAULT_MAX_ENTRIES = 10000
+
+# Bump whenever prompts or output models change so stale verdicts aren't reused
+PROMPT_VERSION = "v3"
+
+
+class TriageCache:
+    """Key/value store for LLM outputs, backed by a single SQLite file."""
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            ttl_seconds: Entries older than this are treated as missing and evicted
+            max_entries: Oldest entries beyond this count are evicted on open
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # SQLite locks the file itself; the timeout makes concurrent runs wait
+        # for each other's writes instead of failing
+        self._conn = sqlite3.connect(self.cache_dir / "triage.sqlite3", timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._evict()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the inputs that determine an LLM output."""
+        # Length-prefix each part so ("a|b", "c") and ("a", "b|c") differ
+        joined = "|".join(f"{len(part)}:{part}" for part in parts)
+        return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        row = self._conn.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        if time.time() - created_at > self.ttl_seconds:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        # Older databases stored uncompressed text
+        if isinstance(value, str):
+            return value
+        return zlib.decompress(value).decode("utf-8")
+
+    def put(self, key: str, value: str) -> None:
+        """Store a value, replacing any existing entry for the key."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, created_at) VALUES (?, ?, ?)",
+            (key, zlib.compress(value.encode("utf-8")), time.time()),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop every entry past its TTL, then the oldest beyond max_entries."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
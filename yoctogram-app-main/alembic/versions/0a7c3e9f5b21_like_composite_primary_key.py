@@ -0,0 +1,48 @@
+"""like composite primary key
+
+Revision ID: 0a7c3e9f5b21
+Revises: f2b6c8d4e915
+Create Date: 2026-10-14 15:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0a7c3e9f5b21"
+down_revision: Union[str, None] = "f2b6c8d4e915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (image_id, user_id) is already unique, so it replaces the surrogate id
+    # as the primary key; the unique constraint and image_id index it makes
+    # redundant go with it
+    op.drop_constraint("like_user_id_image_id_key", "like", type_="unique")
+    op.drop_index(op.f("ix_like_image_id"), table_name="like")
+    op.drop_constraint("like_pkey", "like", type_="primary")
+    op.drop_column("like", "id")
+    op.create_primary_key("like_pkey", "like", ["image_id", "user_id"])
+    op.create_index(op.f("ix_like_user_id"), "like", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_like_user_id"), table_name="like")
+    op.drop_constraint("like_pkey", "like", type_="primary")
+    op.add_column(
+        "like",
+        sa.Column(
+            "id", sa.Uuid(), nullable=False, server_default=sa.text("gen_random_uuid()")
+        ),
+    )
+    op.alter_column("like", "id", server_default=None)
+    op.create_primary_key("like_pkey", "like", ["id"])
+    op.create_index(op.f("ix_like_image_id"), "like", ["image_id"], unique=False)
+    op.create_unique_constraint(
+        "like_user_id_image_id_key", "like", ["user_id", "image_id"]
+    )
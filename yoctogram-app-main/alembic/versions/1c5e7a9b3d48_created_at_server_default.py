@@ -0,0 +1,31 @@
+"""created_at server default
+
+Revision ID: 1c5e7a9b3d48
+Revises: 0a7c3e9f5b21
+Create Date: 2026-10-14 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1c5e7a9b3d48"
+down_revision: Union[str, None] = "0a7c3e9f5b21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("user", "image", "comment"):
+        op.alter_column(
+            table, "created_at", server_default=sa.text("timezone('utc', now())")
+        )
+
+
+def downgrade() -> None:
+    for table in ("user", "image", "comment"):
+        op.alter_column(table, "created_at", server_default=None)
@@ -0,0 +1,50 @@
+"""comment page index id
+
+Revision ID: 6d2f4b8a0e37
+Revises: 1c5e7a9b3d48
+Create Date: 2026-10-14 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6d2f4b8a0e37"
+down_revision: Union[str, None] = "1c5e7a9b3d48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Comment pages now order by (created_at, id); extend the index to match
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comment_image_id_created_at_id",
+            "comment",
+            ["image_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_comment_image_id_created_at",
+            table_name="comment",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comment_image_id_created_at",
+            "comment",
+            ["image_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_comment_image_id_created_at_id",
+            table_name="comment",
+            postgresql_concurrently=True,
+        )
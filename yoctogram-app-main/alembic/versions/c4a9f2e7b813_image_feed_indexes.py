@@ -0,0 +1,53 @@
+"""image feed indexes
+
+Revision ID: c4a9f2e7b813
+Revises: 5e1b8c3a7d92
+Create Date: 2026-10-14 13:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9f2e7b813"
+down_revision: Union[str, None] = "5e1b8c3a7d92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, but doesn't block writes
+    # to image while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_image_public_created_at",
+            "image",
+            [sa.text("created_at DESC")],
+            postgresql_where=sa.text("uploaded AND public"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_image_owner_id_created_at",
+            "image",
+            ["owner_id", sa.text("created_at DESC")],
+            postgresql_where=sa.text("uploaded"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_image_owner_id_created_at",
+            table_name="image",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_image_public_created_at",
+            table_name="image",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,38 @@
+"""comment image_id created_at index
+
+Revision ID: e7d3a5b1c640
+Revises: c4a9f2e7b813
+Create Date: 2026-10-14 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7d3a5b1c640"
+down_revision: Union[str, None] = "c4a9f2e7b813"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_comment_image_id_created_at",
+            "comment",
+            ["image_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comment_image_id_created_at",
+            table_name="comment",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,39 @@
+"""comment user_id index
+
+Revision ID: f2b6c8d4e915
+Revises: e7d3a5b1c640
+Create Date: 2026-10-14 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b6c8d4e915"
+down_revision: Union[str, None] = "e7d3a5b1c640"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_comment_user_id"),
+            "comment",
+            ["user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_comment_user_id"),
+            table_name="comment",
+            postgresql_concurrently=True,
+        )
@@ -1,3 +1,4 @@
+import time
 from typing import AsyncGenerator, Generator
 
 from boto3 import Session as AWSSession
@@ -5,25 +6,46 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from joserfc import jwt
 from joserfc.errors import JoseError
-from joserfc.jwk import OctKey
-from redis.asyncio import Redis, ConnectionPool as RedisConnectionPool
-from sqlalchemy import select
+from redis.asyncio import Redis, BlockingConnectionPool as RedisConnectionPool
+from sqlalchemy.orm import load_only
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
 import structlog
 
 from app.core.config import settings
+from app.core.security import jwt_key
 from app.db.session import session_manager
+from app.ext.s3 import get_s3_client
 from app.models import User
 from app.schemas.user import UserDetail
 
 logger = structlog.stdlib.get_logger("deps")
 
+# Recently verified tokens: token -> (monotonic expiry, user). Entries live
+# at most USER_CACHE_TTL_SECONDS and never past the token's own exp claim.
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_ENTRIES = 10_000
+_user_cache: dict[str, tuple[float, UserDetail]] = {}
+
+# Stateless validator for the standard claims (exp, nbf, ...), built once
+claims_registry = jwt.JWTClaimsRegistry()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 redis_pool = RedisConnectionPool.from_url(
     settings.REDIS_CONNECTION_STRING.unicode_string(),
     encoding="utf-8",
     decode_responses=True,
+    # Requests wait for a free connection instead of opening unbounded ones
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    health_check_interval=30,
+    socket_keepalive=True,
 )
+# One client shared by all requests; it checks connections out of the pool per command
+redis_client = Redis(connection_pool=redis_pool)
+# Shared so the S3 client built from it is reused across requests
+aws_session = AWSSession()
+# Built here on the importing thread, before any request can run S3 calls in
+# worker threads
+get_s3_client(aws_session)
 
 
 async def get_db() -> AsyncGenerator[AsyncDBSession, None]:
@@ -32,34 +54,58 @@ async def get_db() -> AsyncGenerator[AsyncDBSession, None]:
 
 
 def get_aws_session() -> Generator[AWSSession, None, None]:
-    session = AWSSession()
-    yield session
+    yield aws_session
 
 
 def get_redis() -> Generator[Redis, None, None]:
-    redis = Redis(connection_pool=redis_pool)
-    yield redis
+    yield redis_client
+
+
+def _cache_user(token: str, user: UserDetail, exp: int | float | None) -> None:
+    now = time.monotonic()
+    expires_at = now + USER_CACHE_TTL_SECONDS
+    if exp is not None:
+        expires_at = min(expires_at, now + (exp - time.time()))
+
+    if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+        for cached_token, (cached_expiry, _) in list(_user_cache.items()):
+            if cached_expiry <= now:
+                del _user_cache[cached_token]
+        # Still full: drop the oldest insertion
+        if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+            del _user_cache[next(iter(_user_cache))]
+    _user_cache[token] = (expires_at, user)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncDBSession = Depends(get_db)
 ) -> UserDetail:
-    try:
-        key = OctKey.import_key(settings.JWT_SECRET_KEY)
-        claims_requests = jwt.JWTClaimsRegistry()
+    cached = _user_cache.get(token)
+    if cached is not None:
+        expires_at, user = cached
+        if expires_at > time.monotonic():
+            return user
+        _user_cache.pop(token, None)
 
-        claims = jwt.decode(token, key).claims
-        claims_requests.validate(claims)
+    try:
+        claims = jwt.decode(token, jwt_key).claims
+        claims_registry.validate(claims)
 
         uid: str = claims.get("sub")
         if uid is None:
             raise HTTPException(status_code=400, detail="Invalid token")
 
-        db_user = (await db.scalars(select(User).where(User.id == uid))).first()
+        # Primary-key lookup through the identity map, loading only the
+        # columns UserDetail needs
+        db_user = await db.get(
+            User, uid, options=[load_only(User.username, User.email)]
+        )
         if db_user is None:
             raise HTTPException(status_code=401, detail="User not found")
 
-        return UserDetail(id=uid, username=db_user.username, email=db_user.email)
+        user = UserDetail(id=uid, username=db_user.username, email=db_user.email)
+        _cache_user(token, user, claims.get("exp"))
+        return user
     except JoseError as e:
         await logger.ainfo("Exception decoding JWT")
         raise HTTPException(status_code=401, detail="Invalid token") from e
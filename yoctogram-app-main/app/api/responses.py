@@ -0,0 +1,8 @@
+from fastapi.responses import JSONResponse
+
+# Encode response bodies with orjson when it's installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
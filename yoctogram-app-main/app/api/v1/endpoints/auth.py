@@ -38,14 +38,13 @@ async def auth_register(
                 status_code=400,
             )
 
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash(user.password)
 
         db_user = User(
             **user.model_dump(exclude={"password"}), password_hash=hashed_password
         )
         db.add(db_user)
         await db.commit()
-        await db.refresh(db_user)
 
         return {"success": True}
     except Exception as e:
@@ -67,7 +66,9 @@ async def auth_login(
         db_user = (
             await db.scalars(select(User).where(User.username == user.username))
         ).first()
-        if not db_user or not verify_password(user.password, db_user.password_hash):
+        if not db_user or not await verify_password(
+            user.password, db_user.password_hash
+        ):
             await logger.ainfo("Login failed", username=user.username)
             return JSONResponse(
                 content={"success": False, "detail": "Invalid username or password"},
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
 import structlog
 
 from app.api import deps
+from app.api.responses import DefaultJSONResponse
 from app.core.config import settings
 from app.crud.feed import build_feed
 from app.models import Image
@@ -19,19 +20,33 @@ from app.schemas.user import UserDetail
 router = APIRouter()
 logger = structlog.stdlib.get_logger("api.feed")
 
+AFTER_EPOCH = datetime.fromtimestamp(0, tz=timezone.utc).replace(tzinfo=None)
+
+
+def feed_window(
+    before: datetime | None, after: datetime | None
+) -> tuple[datetime, datetime]:
+    # Defaults are resolved per request; a datetime default in the signature
+    # would be fixed at import time. Returns naive UTC like Image.created_at.
+    if before is None:
+        before = datetime.now(timezone.utc) + timedelta(days=1)  # buffer for timezones
+    before = before.astimezone(timezone.utc).replace(tzinfo=None)
+    if after is None:
+        return before, AFTER_EPOCH
+    return before, after.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 @router.get("/latest")
 async def feed_latest(
-    before: datetime = datetime.now(tz=timezone.utc) + timedelta(days=1),  # buffer for timezones
-    after: datetime = datetime.fromtimestamp(0, tz=timezone.utc),
+    before: datetime | None = None,
+    after: datetime | None = None,
     user: UserDetail | None = Depends(deps.verify_jwt_to_uuid_or_none),
     db: AsyncDBSession = Depends(deps.get_db),
     aws: AWSSession = Depends(deps.get_aws_session),
     redis: Redis = Depends(deps.get_redis),
 ) -> Response:
     try:
-        before = before.astimezone(timezone.utc).replace(tzinfo=None)
-        after = after.astimezone(timezone.utc).replace(tzinfo=None)
+        before, after = feed_window(before, after)
 
         image_filters = [
             Image.created_at < before,
@@ -42,7 +57,7 @@ async def feed_latest(
         if user is not None:
             image_filters[-1] = or_(Image.public, Image.owner_id == user.id)
 
-        return JSONResponse(await build_feed(image_filters, db, aws, redis))
+        return DefaultJSONResponse(await build_feed(image_filters, db, aws, redis))
     except Exception as e:
         await logger.aexception("Error building latest feed", user=user.id)
         return JSONResponse(
@@ -57,16 +72,15 @@ async def feed_latest(
 @router.get("/by_user/{creator}")
 async def feed_by_user(
     creator: uuid.UUID,
-    before: datetime = datetime.now(tz=timezone.utc) + timedelta(days=1),  # buffer for timezones
-    after: datetime = datetime.fromtimestamp(0, tz=timezone.utc),
+    before: datetime | None = None,
+    after: datetime | None = None,
     user: UserDetail | None = Depends(deps.verify_jwt_to_uuid_or_none),
     db: AsyncDBSession = Depends(deps.get_db),
     aws: Optional[AWSSession] = Depends(deps.get_aws_session),
     redis: Redis = Depends(deps.get_redis),
 ) -> Response:
     try:
-        before = before.astimezone(timezone.utc).replace(tzinfo=None)
-        after = after.astimezone(timezone.utc).replace(tzinfo=None)
+        before, after = feed_window(before, after)
 
         image_filters = [
             Image.created_at < before,
@@ -75,7 +89,7 @@ async def feed_by_user(
             or_(Image.owner_id == user.id, Image.public),
         ]
 
-        return JSONResponse(await build_feed(image_filters, db, aws, redis))
+        return DefaultJSONResponse(await build_feed(image_filters, db, aws, redis))
     except Exception as e:
         await logger.aexception(
             "Error building by_user feed", user=user.id, creator=creator
@@ -1,3 +1,5 @@
+import asyncio
+
 from boto3.session import Session as AWSSession
 from fastapi import APIRouter, Depends, Response
 from fastapi.responses import JSONResponse
@@ -9,7 +11,13 @@ import structlog
 from ulid import ULID
 
 from app.api import deps
-from app.ext.s3 import create_presigned_post, presigned_url_with_cache, verify_exists
+from app.ext.s3 import (
+    create_presigned_post,
+    create_presigned_url,
+    presigned_url_expiry,
+    presigned_url_with_cache,
+    verify_exists,
+)
 from app.core.config import settings
 from app.crud.image import get_image
 from app.models import Image
@@ -52,7 +60,6 @@ async def images_generate_upload_link(
 
     db.add(db_image)
     await db.commit()
-    await db.refresh(db_image)
 
     return JSONResponse({"success": True} | create_response)
 
@@ -76,16 +83,20 @@ async def images_confirm_uploaded(
             status_code=404,
         )
 
-    if not verify_exists(aws, db_image.path):
+    # head_object is a blocking S3 round trip; keep it off the event loop
+    if not await asyncio.to_thread(verify_exists, aws, db_image.path):
         return JSONResponse(
             {"success": False, "detail": "Image with that ID doesn't exist in S3"},
             status_code=404,
         )
 
     db_image.uploaded = True
+    db_image.presigned_url_expires_at = presigned_url_expiry()
+    db_image.presigned_url = create_presigned_url(
+        aws, db_image.path, db_image.content_type
+    )
     db.add(db_image)
     await db.commit()
-    await db.refresh(db_image)
 
     return JSONResponse({"success": True})
 
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, Response
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import JSONResponse
 from pydantic import UUID4
-from sqlalchemy import select
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
+from sqlalchemy.orm import selectinload
 from ulid import ULID
 
 from app.api import deps
@@ -13,6 +18,10 @@ from app.schemas.user import UserDetail
 
 router = APIRouter()
 
+# Likes and comments are listed a page at a time, newest first
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
 
 @router.post("/{image_id}/like")
 async def images_like(
@@ -26,21 +35,19 @@ async def images_like(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
-    if (
-        await db.scalars(
-            select(Like).where(Like.user_id == user.id, Like.image_id == image_id)
-        )
-    ).first():
+    # An existing like hits the primary key and inserts nothing
+    liked = await db.scalar(
+        insert(Like)
+        .values(image_id=image_id, user_id=user.id)
+        .on_conflict_do_nothing(index_elements=[Like.image_id, Like.user_id])
+        .returning(Like.user_id)
+    )
+    if liked is None:
         return JSONResponse(
             {"success": False, "detail": "User has already liked this image"},
             status_code=400,
         )
-
-    (await db_image.awaitable_attrs.likes).append(
-        Like(user_id=user.id, image_id=image_id, image=db_image)
-    )
     await db.commit()
-    await db.refresh(db_image)
 
     return JSONResponse({"success": True})
 
@@ -57,17 +64,15 @@ async def images_unlike(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
-    for like in await db_image.awaitable_attrs.likes:
-        if like.user_id == user.id:
-            await db.delete(like)
-            await db.commit()
-            await db.refresh(db_image)
-            break
-    else:
+    res = await db.execute(
+        delete(Like).where(Like.image_id == image_id, Like.user_id == user.id)
+    )
+    if res.rowcount == 0:
         return JSONResponse(
             {"success": False, "detail": "User has not liked this image"},
             status_code=400,
         )
+    await db.commit()
 
     return JSONResponse({"success": True})
 
@@ -75,6 +80,8 @@ async def images_unlike(
 @router.get("/{image_id}/likes")
 async def images_get_likes(
     image_id: UUID4,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: UUID | None = None,
     user: UserDetail | None = Depends(deps.verify_jwt_to_uuid_or_none),
     db: AsyncDBSession = Depends(deps.get_db),
 ) -> Response:
@@ -84,15 +91,28 @@ async def images_get_likes(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
+    # Pages walk the (image_id, user_id) primary key, so the order is stable
+    # across pages but otherwise arbitrary (not by account or like age)
+    filters = [Like.image_id == image_id]
+    if cursor is not None:
+        filters.append(Like.user_id < cursor)
+    likes = (
+        await db.scalars(
+            select(Like)
+            .options(selectinload(Like.user))
+            .where(*filters)
+            .order_by(Like.user_id.desc())
+            .limit(limit)
+        )
+    ).all()
     liking_users = [
-        {
-            "id": str(like.user_id),
-            "username": (await like.awaitable_attrs.user).username,
-        }
-        for like in await db_image.awaitable_attrs.likes
+        {"id": str(like.user_id), "username": like.user.username} for like in likes
     ]
+    next_cursor = str(likes[-1].user_id) if len(likes) == limit else None
 
-    return JSONResponse({"success": True, "likes": liking_users})
+    return JSONResponse(
+        {"success": True, "likes": liking_users, "next_cursor": next_cursor}
+    )
 
 
 @router.post("/{image_id}/comment")
@@ -108,7 +128,7 @@ async def images_comment(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
-    (await db_image.awaitable_attrs.comments).append(
+    db.add(
         Comment(
             id=ULID().to_uuid4(),
             user_id=user.id,
@@ -117,7 +137,6 @@ async def images_comment(
         )
     )
     await db.commit()
-    await db.refresh(db_image)
 
     return JSONResponse({"success": True})
 
@@ -136,16 +155,16 @@ async def images_comment(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
-    for db_comment in await db_image.awaitable_attrs.comments:
-        if db_comment.id == comment_id:
-            db_comment.content = comment.content
-            await db.commit()
-            await db.refresh(db_image)
-            break
-    else:
+    res = await db.execute(
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.image_id == image_id)
+        .values(content=comment.content)
+    )
+    if res.rowcount == 0:
         return JSONResponse(
             {"success": False, "detail": "Comment not found"}, status_code=404
         )
+    await db.commit()
 
     return JSONResponse({"success": True})
 
@@ -163,16 +182,14 @@ async def images_comment(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
-    for comment in await db_image.awaitable_attrs.comments:
-        if comment.id == comment_id:
-            await db.delete(comment)
-            await db.commit()
-            await db.refresh(db_image)
-            break
-    else:
+    res = await db.execute(
+        delete(Comment).where(Comment.id == comment_id, Comment.image_id == image_id)
+    )
+    if res.rowcount == 0:
         return JSONResponse(
             {"success": False, "detail": "Comment not found"}, status_code=404
         )
+    await db.commit()
 
     return JSONResponse({"success": True})
 
@@ -180,6 +197,8 @@ async def images_comment(
 @router.get("/{image_id}/comments")
 async def images_get_comments(
     image_id: UUID4,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     user: UserDetail | None = Depends(deps.verify_jwt_to_uuid_or_none),
     db: AsyncDBSession = Depends(deps.get_db),
 ) -> Response:
@@ -189,15 +208,47 @@ async def images_get_comments(
             {"success": False, "detail": "Image not found"}, status_code=404
         )
 
+    # Pages are ordered by (created_at, id), since timestamps alone can tie;
+    # the cursor is "<created_at ISO>,<id>" of the previous page's last comment
+    filters = [Comment.image_id == image_id]
+    if cursor is not None:
+        try:
+            cursor_ts, cursor_id = cursor.split(",")
+            cursor_ts, cursor_id = datetime.fromisoformat(cursor_ts), UUID(cursor_id)
+        except ValueError:
+            return JSONResponse(
+                {"success": False, "detail": "Invalid cursor"}, status_code=400
+            )
+        if cursor_ts.tzinfo is not None:
+            cursor_ts = cursor_ts.astimezone(timezone.utc).replace(tzinfo=None)
+        filters.append(
+            tuple_(Comment.created_at, Comment.id) < tuple_(cursor_ts, cursor_id)
+        )
+    db_comments = (
+        await db.scalars(
+            select(Comment)
+            .options(selectinload(Comment.user))
+            .where(*filters)
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
+            .limit(limit)
+        )
+    ).all()
     comments = [
         {
             "id": str(comment.id),
             "user_id": str(comment.user_id),
-            "username": (await comment.awaitable_attrs.user).username,
+            "username": comment.user.username,
             "content": comment.content,
             "created_at": comment.created_at.timestamp(),
         }
-        for comment in await db_image.awaitable_attrs.comments
+        for comment in db_comments
     ]
-
-    return JSONResponse({"success": True, "comments": comments})
+    # ISO format keeps the full precision a float timestamp could round off
+    next_cursor = None
+    if len(db_comments) == limit:
+        last = db_comments[-1]
+        next_cursor = f"{last.created_at.isoformat()},{last.id}"
+
+    return JSONResponse(
+        {"success": True, "comments": comments, "next_cursor": next_cursor}
+    )
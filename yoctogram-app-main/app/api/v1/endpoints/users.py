@@ -2,7 +2,7 @@ import uuid
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
 import structlog
 
@@ -26,7 +26,13 @@ async def users_username_from_id(
     user: uuid.UUID, db: AsyncDBSession = Depends(deps.get_db)
 ) -> JSONResponse:
     try:
-        db_user = (await db.scalars(select(User).where(User.id == user))).first()
+        db_user = (
+            await db.execute(
+                lambda_stmt(
+                    lambda: select(User.username, User.bio).where(User.id == user)
+                )
+            )
+        ).first()
         if not db_user:
             return JSONResponse(
                 content={"success": False, "detail": "User not found"},
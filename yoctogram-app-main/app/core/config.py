@@ -11,6 +11,11 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     PRODUCTION: bool = True
     DEBUG: bool = False
+    ACCESS_LOG: bool = True
+    # Behind a load balancer, log the client address it appends to
+    # X-Forwarded-For instead of the balancer's own. Leave off when clients
+    # can reach the app directly, since they could then set the header.
+    ACCESS_LOG_FORWARDED_FOR: bool = False
 
     PROJECT_NAME: str = "yoctogram"
     API_PREFIX: str = "/api/v1"
@@ -25,13 +30,24 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_CONNECTION_STRING: Optional[PostgresDsn] = None
+    POSTGRES_POOL_SIZE: int = 20
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: int = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    # PgBouncer in transaction mode pools connections itself and can't keep
+    # asyncpg's prepared statements across transactions
+    POSTGRES_BEHIND_PGBOUNCER: bool = False
 
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_CONNECTION_STRING: Optional[RedisDsn] = None
+    REDIS_MAX_CONNECTIONS: int = 64
 
     JWT_SECRET_KEY: str = secrets.token_urlsafe(32)
     JWT_ALGORITHM: str = "HS256"
+    # Cost of new password hashes; existing hashes keep the cost they were
+    # created with
+    BCRYPT_ROUNDS: int = 12
 
     IMAGE_PAGINATION: int = 100
 
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Any, Union
 
@@ -8,6 +9,10 @@ from joserfc.jwk import OctKey
 
 from app.core.config import settings
 
+# Imported once; the secret doesn't change while the process runs
+jwt_key = OctKey.import_key(settings.JWT_SECRET_KEY)
+jwt_header = {"alg": settings.JWT_ALGORITHM}
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -19,18 +24,30 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    key = OctKey.import_key(settings.JWT_SECRET_KEY)
-    header = {"alg": settings.JWT_ALGORITHM}
     claims = {"exp": expire, "sub": str(subject)}
 
-    return jwt.encode(header, claims, key)
+    return jwt.encode(jwt_header, claims, jwt_key)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode("utf-8"), hashed_password.encode("utf-8")
     )
 
 
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+def _get_password_hash_sync(password: str) -> str:
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    ).decode("utf-8")
+
+
+# bcrypt is deliberately slow and releases the GIL, so hashing runs in a
+# worker thread instead of stalling the event loop
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.to_thread(
+        _verify_password_sync, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    return await asyncio.to_thread(_get_password_hash_sync, password)
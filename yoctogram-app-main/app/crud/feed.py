@@ -1,13 +1,14 @@
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List
 
 from boto3.session import Session as AWSSession
 from redis.asyncio import Redis
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
 
 from app.core.config import settings
-from app.ext.s3 import presigned_url_with_cache
-from app.models import Image
+from app.ext.s3 import presigned_urls_with_cache
+from app.models import Image, Like
 
 
 async def build_feed(
@@ -17,28 +18,48 @@ async def build_feed(
     redis: Redis,
 ) -> Dict[str, str | int]:
     filters.append(Image.uploaded == True)
-    db_images = await db.stream_scalars(
-        select(Image)
+    # Like counts come from the same query instead of one lazy load per image
+    db_images = await db.stream(
+        select(Image, func.count(Like.user_id).label("like_count"))
+        .outerjoin(Like, Like.image_id == Image.id)
         .where(*filters)
+        .group_by(Image.id)
         .order_by(Image.created_at.desc())
         .limit(settings.IMAGE_PAGINATION)
     )
 
+    rows = [row async for row in db_images]
+
+    # Use the URL stored on the row while it has at least an hour left, the
+    # same margin the Redis cache keeps; only the rest go through Redis and,
+    # on a miss, S3 signing
+    reuse_before = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    download_urls = [
+        image_record.presigned_url
+        if image_record.presigned_url_expires_at
+        and image_record.presigned_url_expires_at > reuse_before
+        else None
+        for image_record, _ in rows
+    ]
+    stale = [i for i, url in enumerate(download_urls) if url is None]
+    refreshed = await presigned_urls_with_cache(
+        aws,
+        redis,
+        [(rows[i][0].path, rows[i][0].content_type) for i in stale],
+    )
+    for i, url in zip(stale, refreshed):
+        download_urls[i] = url
+
     return_content = {"success": True, "count": 0, "results": []}
-    async for image_record in db_images:
+    for (image_record, like_count), download_url in zip(rows, download_urls):
         return_content["results"].append(
             {
                 "id": str(image_record.id),
                 "creator": str(image_record.owner_id),
-                "download_url": await presigned_url_with_cache(
-                    aws,
-                    redis,
-                    image_record.path,
-                    image_record.content_type,
-                ),
+                "download_url": download_url,
                 "created_at": image_record.created_at.timestamp(),
                 "caption": image_record.caption,
-                "like_count": len(await image_record.awaitable_attrs.likes),
+                "like_count": like_count,
             }
         )
         return_content["count"] += 1
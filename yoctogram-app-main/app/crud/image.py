@@ -1,4 +1,4 @@
-from sqlalchemy import false, or_, select
+from sqlalchemy import Row, lambda_stmt, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession as AsyncDBSession
 from pydantic import UUID4
 
@@ -9,13 +9,19 @@ async def get_image(
     db: AsyncDBSession,
     image_id: UUID4,
     user_id: UUID4 | None,
-) -> Image | None:
-    return (
-        await db.scalars(
-            select(Image).where(
-                Image.id == image_id,
-                or_(Image.owner_id == user_id if user_id else false(), Image.public),
-                Image.uploaded == True,
-            )
-        )
-    ).first()
+) -> Row | None:
+    # Callers only check visibility or presign the object, so fetch those
+    # columns as a plain row rather than a full ORM entity. Built as a lambda
+    # statement so SQLAlchemy reuses the constructed query per call site and
+    # only binds the IDs.
+    stmt = lambda_stmt(
+        lambda: select(
+            Image.id, Image.path, Image.content_type, Image.owner_id
+        ).where(Image.id == image_id, Image.uploaded == True)
+    )
+    if user_id:
+        stmt += lambda s: s.where(or_(Image.owner_id == user_id, Image.public))
+    else:
+        stmt += lambda s: s.where(Image.public)
+
+    return (await db.execute(stmt)).first()
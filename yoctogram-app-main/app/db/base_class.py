@@ -1,6 +1,12 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 
 
+# Server-side default for naive UTC timestamp columns. now() alone would be
+# converted to the session's time zone when stored without one.
+UTC_NOW = text("timezone('utc', now())")
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     pass
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
 )
+from sqlalchemy.pool import NullPool
 import structlog
 
 from app.core.config import settings
@@ -18,7 +19,11 @@ logger = structlog.stdlib.get_logger("db.session")
 class DatabaseSessionManager:
     def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
         self._engine = create_async_engine(host, **engine_kwargs)
-        self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
+        # Handlers don't read objects back after committing, so there's no need
+        # to expire them and reload on the next attribute access
+        self._sessionmaker = async_sessionmaker(
+            autocommit=False, bind=self._engine, expire_on_commit=False
+        )
 
     async def close(self):
         if self._engine is None:
@@ -59,6 +64,20 @@ class DatabaseSessionManager:
             await session.close()
 
 
+if settings.POSTGRES_BEHIND_PGBOUNCER:
+    engine_kwargs = {
+        "poolclass": NullPool,
+        "connect_args": {"statement_cache_size": 0},
+    }
+else:
+    engine_kwargs = {
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    }
+
 session_manager = DatabaseSessionManager(
-    settings.POSTGRES_CONNECTION_STRING.unicode_string()
+    settings.POSTGRES_CONNECTION_STRING.unicode_string(), engine_kwargs
 )
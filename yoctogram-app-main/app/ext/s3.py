@@ -1,13 +1,15 @@
 from datetime import datetime, timedelta, timezone
 import logging
+from threading import Lock
 from time import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
 
 from boto3.session import Session as AWSSession
+from botocore.auth import AUTH_TYPE_MAPS, SIGV4_TIMESTAMP, S3SigV4QueryAuth
 from botocore.config import Config
-from botocore.exceptions import ClientError
-from freezegun import freeze_time
+from botocore.exceptions import ClientError, NoCredentialsError
 from mypy_boto3_s3.client import S3Client
 from redis.asyncio import Redis
 import structlog
@@ -16,6 +18,69 @@ from app.core.config import settings
 
 logger = structlog.stdlib.get_logger("ext.s3")
 
+s3_config = Config(
+    region_name=settings.AWS_DEFAULT_REGION,
+    s3={"addressing_style": "virtual"},
+)
+# Building a client loads botocore's service model, so each session builds one
+# and reuses it. Clients are thread-safe but sessions aren't, and the first
+# call may come from a worker thread (asyncio.to_thread), so creation is locked.
+_s3_clients: "WeakKeyDictionary[AWSSession, S3Client]" = WeakKeyDictionary()
+_s3_clients_lock = Lock()
+
+# Settings don't change while the process runs, so values derived from them
+# are computed once instead of per presigned URL
+UPLOAD_EXPIRY = timedelta(hours=1)
+# A tuple, copied per call: generate_presigned_post appends the bucket and key
+# conditions to the list it's given
+UPLOAD_CONDITIONS = (
+    ("content-length-range", 1, 10 * 1000 * 1000),
+    {"bucket": (settings.IMAGES_BUCKET)},
+)
+CACHE_AGE = settings.PRESIGNED_URL_EXPIRY - int(timedelta(hours=1).total_seconds())
+CACHE_CONTROL = f"private, max-age={CACHE_AGE}, immutable"
+
+
+def presign_window_start(now: float) -> datetime:
+    return datetime.fromtimestamp(
+        now - (now % settings.PRESIGNED_URL_EXPIRY), tz=timezone.utc
+    )
+
+
+def presigned_url_expiry() -> datetime:
+    # When URLs signed now stop working, as naive UTC like the model timestamps
+    return (
+        presign_window_start(time()) + timedelta(seconds=settings.PRESIGNED_URL_EXPIRY)
+    ).replace(tzinfo=None)
+
+
+class WindowedS3SigV4QueryAuth(S3SigV4QueryAuth):
+    # Signs as of the start of the current PRESIGNED_URL_EXPIRY window instead
+    # of now, so the same object gets the same URL (and browser cache entry)
+    # for the whole window. Same steps as SigV4Auth.add_auth with a fixed clock.
+    def add_auth(self, request):
+        if self.credentials is None:
+            raise NoCredentialsError()
+        request.context["timestamp"] = presign_window_start(time()).strftime(
+            SIGV4_TIMESTAMP
+        )
+        self._modify_request_before_signing(request)
+        canonical_request = self.canonical_request(request)
+        string_to_sign = self.string_to_sign(request, canonical_request)
+        signature = self.signature(string_to_sign, request)
+        self._inject_signature_to_request(request, signature)
+
+
+AUTH_TYPE_MAPS["s3v4-windowed-query"] = WindowedS3SigV4QueryAuth
+
+
+def choose_windowed_presigner(signature_version, **kwargs) -> str | None:
+    # Only presigned URLs ("-query" signers); regular requests and presigned
+    # POSTs keep botocore's choice
+    if isinstance(signature_version, str) and signature_version.endswith("-query"):
+        return "s3v4-windowed-query"
+    return None
+
 
 def get_resource_prefix() -> str:
     now = datetime.now(timezone.utc)
@@ -28,22 +93,30 @@ def parse_s3_uri(uri: str) -> Dict[str, str]:
 
 
 def get_s3_client(session: AWSSession) -> S3Client:
-    return session.client(
-        "s3",
-        endpoint_url=settings.S3_ENDPOINT,
-        config=Config(
-            region_name=settings.AWS_DEFAULT_REGION,
-            s3={"addressing_style": "virtual"},
-        ),
-    )
+    s3_client = _s3_clients.get(session)
+    if s3_client is not None:
+        return s3_client
+
+    with _s3_clients_lock:
+        s3_client = _s3_clients.get(session)
+        if s3_client is None:
+            s3_client = session.client(
+                "s3", endpoint_url=settings.S3_ENDPOINT, config=s3_config
+            )
+            # Ahead of botocore's own choose-signer handlers, which would
+            # otherwise answer first
+            s3_client.meta.events.register_first(
+                "choose-signer.s3.GetObject", choose_windowed_presigner
+            )
+            _s3_clients[session] = s3_client
+    return s3_client
 
 
 def create_presigned_post(session: AWSSession, object_name: str) -> Dict[str, Any]:
-    expiry = timedelta(hours=1)
     logger.info(
         "Creating presigned POST",
         object_name=object_name,
-        expiry=(datetime.now(timezone.utc) + expiry).isoformat(),
+        expiry=(datetime.now(timezone.utc) + UPLOAD_EXPIRY).isoformat(),
     )
 
     s3_client = get_s3_client(session)
@@ -53,10 +126,9 @@ def create_presigned_post(session: AWSSession, object_name: str) -> Dict[str, An
             settings.IMAGES_BUCKET,
             bucket_key,
             Conditions=[
-                ["content-length-range", 1, 10 * 1000 * 1000],
-                {"bucket": (settings.IMAGES_BUCKET)},
+                dict(c) if isinstance(c, dict) else [*c] for c in UPLOAD_CONDITIONS
             ],
-            ExpiresIn=int(expiry.total_seconds()),
+            ExpiresIn=int(UPLOAD_EXPIRY.total_seconds()),
         )
     except ClientError:
         logger.exception("Failed to create presigned POST")
@@ -73,45 +145,38 @@ def create_presigned_url(session: AWSSession, s3_uri: str, content_type: str) ->
     s3_client = get_s3_client(session)
 
     try:
-        current_timestamp = time()
-        cache_age = settings.PRESIGNED_URL_EXPIRY - int(
-            timedelta(hours=1).total_seconds()
-        )
-        frozen_timestamp = datetime.fromtimestamp(
-            current_timestamp - (current_timestamp % settings.PRESIGNED_URL_EXPIRY)
-        )
+        frozen_timestamp = presign_window_start(time())
 
         logger.info(
             "Creating presigned URL",
             s3_uri=s3_uri,
             content_type=content_type,
-            cache_age=cache_age,
+            cache_age=CACHE_AGE,
             expiry=settings.PRESIGNED_URL_EXPIRY,
             frozen_timestamp=frozen_timestamp.isoformat(),
         )
 
-        # Freeze the time at the beginning of the epoch week to allow browser to
-        # cache the presigned URL for a week
-        with freeze_time(frozen_timestamp):
-            presigned_url = s3_client.generate_presigned_url(
-                "get_object",
-                Params=parse_s3_uri(s3_uri)
-                | {
-                    "ResponseContentType": content_type,
-                    "ResponseCacheControl": f"private, max-age={cache_age}, immutable",
-                },
-                ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
-            )
+        # Signed as of the beginning of the epoch week (WindowedS3SigV4QueryAuth)
+        # to allow browser to cache the presigned URL for a week
+        presigned_url = s3_client.generate_presigned_url(
+            "get_object",
+            Params=parse_s3_uri(s3_uri)
+            | {
+                "ResponseContentType": content_type,
+                "ResponseCacheControl": CACHE_CONTROL,
+            },
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
+        )
 
-            # Replace the S3 hostname with the Cloudfront distribution in production
-            if settings.PRODUCTION:
-                return (
-                    urlparse(presigned_url)
-                    ._replace(netloc=(settings.IMAGES_CLOUDFRONT_DISTRIBUTION))
-                    .geturl()
-                )
+        # Replace the S3 hostname with the Cloudfront distribution in production
+        if settings.PRODUCTION:
+            return (
+                urlparse(presigned_url)
+                ._replace(netloc=(settings.IMAGES_CLOUDFRONT_DISTRIBUTION))
+                .geturl()
+            )
 
-            return presigned_url
+        return presigned_url
     except ClientError:
         logger.exception("Failed to create presigned URL")
         return None
@@ -140,6 +205,36 @@ async def presigned_url_with_cache(
     return None
 
 
+async def presigned_urls_with_cache(
+    session: AWSSession, redis: Redis, objects: List[Tuple[str, str]]
+) -> List[str | None]:
+    if not objects:
+        return []
+
+    redis_keys = [f"s3_presigned_url:{s3_uri}" for s3_uri, _ in objects]
+    urls: List[str | None] = await redis.mget(redis_keys)
+
+    misses = [i for i, url in enumerate(urls) if not url]
+    await logger.ainfo(
+        "Looked up presigned URLs for S3 objects in Redis",
+        count=len(objects),
+        misses=len(misses),
+    )
+    if not misses:
+        return urls
+
+    created = [create_presigned_url(session, *objects[i]) for i in misses]
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for i, presigned_url in zip(misses, created):
+            urls[i] = presigned_url
+            if presigned_url:
+                pipe.set(redis_keys[i], presigned_url, ex=settings.PRESIGNED_URL_EXPIRY)
+        await pipe.execute()
+
+    return urls
+
+
 def verify_exists(session: AWSSession, s3_uri: str) -> bool:
     s3_client = get_s3_client(session)
     try:
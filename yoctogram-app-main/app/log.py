@@ -1,11 +1,17 @@
 # https://gist.github.com/nymous/f138c7f06062b7c43c060bf03759c29e
 
+import json
 import logging
 import sys
 
 import structlog
 from structlog.types import EventDict, Processor
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # https://github.com/hynek/structlog/issues/35#issuecomment-591321744
 def rename_event_key(_, __, event_dict: EventDict) -> EventDict:
@@ -28,6 +34,14 @@ def drop_color_message_key(_, __, event_dict: EventDict) -> EventDict:
     return event_dict
 
 
+def orjson_dumps(obj, default=None, **_) -> str:
+    """
+    JSON serializer for `JSONRenderer` backed by orjson. Records still go through
+    the stdlib `logging` handler, which writes text, so the bytes are decoded.
+    """
+    return orjson.dumps(obj, default=default).decode()
+
+
 def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
@@ -62,7 +76,9 @@ def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
 
     log_renderer: structlog.types.Processor
     if json_logs:
-        log_renderer = structlog.processors.JSONRenderer()
+        log_renderer = structlog.processors.JSONRenderer(
+            serializer=orjson_dumps if orjson is not None else json.dumps
+        )
     else:
         log_renderer = structlog.dev.ConsoleRenderer()
 
@@ -1,16 +1,21 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 import time
 
 from asgi_correlation_id import correlation_id
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 from uvicorn.protocols.utils import get_path_with_query_string
 
+from app.api.deps import redis_client, redis_pool
+from app.api.responses import DefaultJSONResponse
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.session import session_manager
 from app.log import setup_logging
+from app.profiling import Profiler, ProfilingMiddleware
 
 setup_logging(
     json_logs=settings.PRODUCTION, log_level="DEBUG" if settings.DEBUG else "INFO"
@@ -23,69 +28,167 @@ async def lifespan(_: FastAPI):
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
     """
+    access_log_writer = asyncio.create_task(write_access_logs())
+    # Open the first pooled Redis connection before traffic arrives. Only a
+    # warm-up: most routes don't need Redis, so a failure mustn't stop startup.
+    try:
+        await redis_client.ping()
+    except Exception:
+        await structlog.stdlib.get_logger("app.startup").awarning(
+            "Could not warm up the Redis connection pool", exc_info=True
+        )
     yield
+    access_log_writer.cancel()
+    with suppress(asyncio.CancelledError):
+        await access_log_writer
+    # Flush whatever was queued after the writer's last pass
+    while not access_log_queue.empty():
+        write_access_log(access_log_queue.get_nowait())
+
     if session_manager._engine is not None:
         # Close the DB connection
         await session_manager.close()
+    await redis_pool.disconnect()
 
 
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_PREFIX}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
 )
 
 if settings.PRODUCTION:
     origins = [f"https://{settings.FORWARD_FACING_HOSTNAME}"]
+    # Only what the frontend sends, so preflight responses are precomputed
+    # rather than echoing each request's headers back
+    cors_methods = ["GET", "POST"]
+    cors_headers = ["authorization", "content-type"]
 else:
     origins = ["*"]
+    cors_methods = ["*"]  # Allows all methods
+    cors_headers = ["*"]  # Allows all headers
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=cors_methods,
+    allow_headers=cors_headers,
+    # Let browsers reuse a preflight result for a day
+    max_age=86400,
 )
 
 access_logger = structlog.stdlib.get_logger("app.access")
 
+# Access log entries are queued by the middleware and written by a background
+# task, so responses don't wait on log rendering and output. If the writer
+# falls this far behind, new entries are dropped and counted instead.
+ACCESS_LOG_QUEUE_SIZE = 10_000
+access_log_queue: asyncio.Queue = asyncio.Queue(maxsize=ACCESS_LOG_QUEUE_SIZE)
+dropped_access_logs = 0
+# Polled by the load balancer health check; not worth an access log line each
+UNLOGGED_PATHS = frozenset({f"{settings.API_PREFIX}/health"})
 
-@app.middleware("http")
-async def logging_middleware(request: Request, call_next) -> Response:
-    structlog.contextvars.clear_contextvars()
 
-    start_time = time.perf_counter_ns()
-    # If the call_next raises an error, we still want to return our own 500 response,
-    # so we can add headers to it (process time, request ID...)
-    response = Response(status_code=500)
-    try:
-        response = await call_next(request)
-    except Exception:
-        # TODO: Validate that we don't swallow exceptions (unit test?)
-        structlog.stdlib.get_logger("app.error").exception("Uncaught exception")
-        raise
-    finally:
-        process_time = time.perf_counter_ns() - start_time
-        status_code = response.status_code
-        url = get_path_with_query_string(request.scope)
-        client_host = request.client.host
-        client_port = request.client.port
-        http_method = request.method
-        http_version = request.scope["http_version"]
-        # Recreate the Uvicorn access log format, but add all parameters as structured information
-        await access_logger.ainfo(
-            f"""{client_host}:{client_port} - "{http_method} {url} HTTP/{http_version}" {status_code}""",
-            http={
-                "url": str(request.url),
-                "status_code": status_code,
-                "method": http_method,
-                "version": http_version,
-            },
-            network={"client": {"ip": client_host, "port": client_port}},
-            duration=process_time,
-        )
-        response.headers["X-Process-Time"] = str(process_time / 10**9)
-        return response
+def write_access_log(fields: dict) -> None:
+    # Recreate the Uvicorn access log format, but add all parameters as
+    # structured information. Formatted here rather than in the middleware,
+    # so building the message stays off the request path.
+    http, client = fields["http"], fields["network"]["client"]
+    access_logger.info(
+        f"""{client['ip']}:{client['port']} - "{http['method']} {http['url']} HTTP/{http['version']}" {http['status_code']}""",
+        **fields,
+    )
+
+
+async def write_access_logs() -> None:
+    global dropped_access_logs
+    while True:
+        write_access_log(await access_log_queue.get())
+        if dropped_access_logs and access_log_queue.empty():
+            access_logger.warning(
+                "Dropped access log entries", count=dropped_access_logs
+            )
+            dropped_access_logs = 0
+
+
+class LoggingMiddleware:
+    # Pure ASGI rather than @app.middleware("http"): BaseHTTPMiddleware runs
+    # every request through an extra task group and memory stream
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global dropped_access_logs
+        if (
+            scope["type"] != "http"
+            or not settings.ACCESS_LOG
+            or scope["path"] in UNLOGGED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        structlog.contextvars.clear_contextvars()
+
+        start_time = time.perf_counter_ns()
+        process_time = None
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal process_time, status_code
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter_ns() - start_time
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-process-time", str(process_time / 10**9).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            structlog.stdlib.get_logger("app.error").exception("Uncaught exception")
+            if process_time is not None:
+                raise
+            # Nothing was sent yet, so we can still return our own 500 response
+            # with the process time header
+            await Response(status_code=500)(scope, receive, send_wrapper)
+        finally:
+            if process_time is None:
+                process_time = time.perf_counter_ns() - start_time
+            client_host, client_port = scope.get("client") or (None, None)
+            if settings.ACCESS_LOG_FORWARDED_FOR:
+                for name, value in scope["headers"]:
+                    if name == b"x-forwarded-for":
+                        # The last hop is the one the load balancer appended;
+                        # anything before it came from the client
+                        client_host = value.rsplit(b",", 1)[-1].strip().decode()
+                        break
+            # Context vars are captured now, since the writer task runs outside
+            # this request's context
+            entry = structlog.contextvars.get_contextvars() | {
+                "http": {
+                    "url": get_path_with_query_string(scope),
+                    "status_code": status_code,
+                    "method": scope["method"],
+                    "version": scope["http_version"],
+                },
+                "network": {"client": {"ip": client_host, "port": client_port}},
+                "duration": process_time,
+            }
+            try:
+                access_log_queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                dropped_access_logs += 1
+
+
+# ?profile=1 returns a pyinstrument report for the request, outside production
+if not settings.PRODUCTION and Profiler is not None:
+    app.add_middleware(ProfilingMiddleware)
 
+app.add_middleware(LoggingMiddleware)
 
 app.include_router(api_router, prefix=settings.API_PREFIX)
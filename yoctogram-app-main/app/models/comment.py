@@ -1,21 +1,27 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from ulid import ULID
 
-from app.db.base_class import Base
+from app.db.base_class import UTC_NOW, Base
 
 
 class Comment(Base):
     __tablename__ = "comment"
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=ULID().to_uuid4())
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"))
+    __table_args__ = (
+        Index(
+            "ix_comment_image_id_created_at_id",
+            "image_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=lambda: ULID().to_uuid4())
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"), index=True)
     user: Mapped["User"] = relationship(back_populates="comments")
     image_id: Mapped[UUID] = mapped_column(ForeignKey("image.id"))
     image: Mapped["Image"] = relationship(back_populates="comments")
     content: Mapped[str] = mapped_column()
-    created_at: Mapped[datetime] = mapped_column(
-        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
-    )
+    created_at: Mapped[datetime] = mapped_column(server_default=UTC_NOW)
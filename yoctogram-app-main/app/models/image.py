@@ -1,26 +1,49 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from ulid import ULID
 
-from app.db.base_class import Base
+from app.db.base_class import UTC_NOW, Base
 
 
 class Image(Base):
     __tablename__ = "image"
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=ULID().to_uuid4())
+    # Feed queries filter on confirmed uploads and page by created_at desc:
+    # one index for the public feed, one for per-owner feeds
+    __table_args__ = (
+        Index(
+            "ix_image_public_created_at",
+            text("created_at DESC"),
+            postgresql_where=text("uploaded AND public"),
+        ),
+        Index(
+            "ix_image_owner_id_created_at",
+            "owner_id",
+            text("created_at DESC"),
+            postgresql_where=text("uploaded"),
+        ),
+    )
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=lambda: ULID().to_uuid4())
     path: Mapped[str] = mapped_column()
     content_type: Mapped[str] = mapped_column()
-    created_at: Mapped[datetime] = mapped_column(
-        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
-    )
+    created_at: Mapped[datetime] = mapped_column(server_default=UTC_NOW)
     public: Mapped[bool] = mapped_column(default=False)
     owner_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"))
     owner: Mapped["User"] = relationship(back_populates="images")
     uploaded: Mapped[bool] = mapped_column(default=False)
     caption: Mapped[str] = mapped_column()
-    likes: Mapped[List["Like"]] = relationship(back_populates="image")
-    comments: Mapped[List["Comment"]] = relationship(back_populates="image")
+    # Current presigned download URL, stored at upload confirmation so feeds
+    # can skip Redis and S3 signing until it expires
+    presigned_url: Mapped[str | None] = mapped_column(nullable=True)
+    presigned_url_expires_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    # Unbounded collections: query them with explicit filters and limits (or
+    # selectinload) instead of loading them off an Image
+    likes: Mapped[List["Like"]] = relationship(
+        back_populates="image", lazy="raise_on_sql"
+    )
+    comments: Mapped[List["Comment"]] = relationship(
+        back_populates="image", lazy="raise_on_sql"
+    )
@@ -64,8 +64,8 @@ async def init_redis():
 
 async def main():
     await logger.ainfo("Initializing service")
-    await init_db()
-    await init_redis()
+    # Independent waits, so start-up takes the longer of the two, not the sum
+    await asyncio.gather(init_db(), init_redis())
     await logger.ainfo("Service finished initializing")
 
 
@@ -0,0 +1,43 @@
+from urllib.parse import parse_qs
+
+from fastapi.responses import HTMLResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles any request made with `?profile=1` using pyinstrument and returns
+    the profiler's HTML report instead of the endpoint's response. Only meant
+    for development: registered in main.py when not in production and
+    pyinstrument is installed.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or b"profile" not in scope["query_string"]:
+            await self.app(scope, receive, send)
+            return
+
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        if query.get("profile", [""])[0] not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+
+        async def discard(_) -> None:
+            pass
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        await HTMLResponse(profiler.output_html())(scope, receive, send)
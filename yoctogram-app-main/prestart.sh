@@ -7,4 +7,9 @@ python /code/app/prestart.py
 # Run migrations
 alembic upgrade head
 
-uvicorn app.main:app --host 0.0.0.0 --port 80 --log-config /code/app/log_config.json
+# Access logs come from LoggingMiddleware, so uvicorn doesn't build its own,
+# and it reads the client address from X-Forwarded-For itself
+# (ACCESS_LOG_FORWARDED_FOR), so uvicorn's proxy headers handling is off.
+# The event loop and HTTP parser are left on "auto", which picks uvloop and
+# httptools whenever they're installed.
+uvicorn app.main:app --host 0.0.0.0 --port 80 --log-config /code/app/log_config.json --no-access-log --no-proxy-headers
@@ -0,0 +1,65 @@
+import os
+import unittest
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+# Settings are read from the environment when app.core.config is imported
+for name, value in {
+    "PRODUCTION": "false",
+    "FORWARD_FACING_HOSTNAME": "localhost",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "yoctogram",
+    "POSTGRES_PASSWORD": "yoctogram",
+    "POSTGRES_DB": "yoctogram",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "IMAGES_BUCKET": "yoctogram-images",
+}.items():
+    os.environ.setdefault(name, value)
+
+from boto3.session import Session as AWSSession  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.ext.s3 import create_presigned_url, presign_window_start  # noqa: E402
+
+S3_URI = f"s3://{settings.IMAGES_BUCKET}/2024/01/01/image.png"
+# Some time after the start of a window, so signing at "now" would differ
+NOW = 1_700_000_000.0
+WINDOW_START = NOW - (NOW % settings.PRESIGNED_URL_EXPIRY)
+
+
+class WindowedPresignTest(unittest.TestCase):
+    def setUp(self):
+        self.session = AWSSession(
+            aws_access_key_id="AKIDEXAMPLE",
+            aws_secret_access_key="wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+            region_name=settings.AWS_DEFAULT_REGION,
+        )
+
+    def presign_at(self, now: float) -> str:
+        with patch("app.ext.s3.time", return_value=now):
+            return create_presigned_url(self.session, S3_URI, "image/png")
+
+    def test_same_window_gives_same_url(self):
+        self.assertEqual(self.presign_at(NOW), self.presign_at(NOW))
+        self.assertEqual(self.presign_at(NOW), self.presign_at(NOW + 3600))
+
+    def test_signed_at_window_start(self):
+        query = parse_qs(urlparse(self.presign_at(NOW)).query)
+        self.assertEqual(
+            query["X-Amz-Date"],
+            [presign_window_start(NOW).strftime("%Y%m%dT%H%M%SZ")],
+        )
+        self.assertEqual(presign_window_start(NOW).timestamp(), WINDOW_START)
+        self.assertEqual(query["X-Amz-Expires"], [str(settings.PRESIGNED_URL_EXPIRY)])
+
+    def test_next_window_gives_new_url(self):
+        self.assertNotEqual(
+            self.presign_at(NOW),
+            self.presign_at(WINDOW_START + settings.PRESIGNED_URL_EXPIRY),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()